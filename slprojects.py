@@ -1,13 +1,28 @@
+import atexit
+import copy
+import functools
+import hashlib
+import httpx
+import itertools
 import json
+import logging
+import logging.handlers
 import os
+import queue
 import requests
 import re
+import tempfile
 import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError, wait
 from datetime import datetime
 from flask import Flask, request
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from slack_bolt import App
 from slack_bolt.adapter.flask import SlackRequestHandler
-from openai import OpenAI
+from slack_sdk.errors import SlackApiError
+from openai import DefaultHttpxClient, OpenAI
 from apscheduler.schedulers.background import BackgroundScheduler
 
 # Try importing FPDF for PDF generation
@@ -18,6 +33,42 @@ except ImportError:
     PDF_AVAILABLE = False
     print("⚠️ FPDF not installed. PDF features will be disabled.")
 
+# Try importing orjson for faster JSON (de)serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# fcntl (POSIX only) lets gunicorn workers coordinate startup work
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False
+
+# Try importing msgspec for typed decoding of AI JSON output
+try:
+    import msgspec
+    MSGSPEC_AVAILABLE = True
+except ImportError:
+    MSGSPEC_AVAILABLE = False
+
+# Error paths (with the traceback) and project-save lines log through here; other progress
+# output still uses print.
+# Callers only enqueue the record; a listener thread does the stdout write.
+logger = logging.getLogger("slprojects")
+if not logger.handlers:
+    _log_queue = queue.SimpleQueue()
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter("%(message)s"))
+    _LOG_LISTENER = logging.handlers.QueueListener(_log_queue, _log_handler)
+    _LOG_LISTENER.start()
+    atexit.register(_LOG_LISTENER.stop)  # Drains whatever is still queued
+    logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
 # --- CONFIGURATION ---
 SLACK_BOT_TOKEN = os.environ.get("SLACK_BOT_TOKEN")
 SLACK_SIGNING_SECRET = os.environ.get("SLACK_SIGNING_SECRET")
@@ -30,7 +81,29 @@ GIST_FILENAME = "projects.json"
 
 # OpenAI Config
 OPENAI_API_KEY = os.environ.get("OPENAI_API_KEY")
-ai_client = OpenAI(api_key=OPENAI_API_KEY) if OPENAI_API_KEY else None
+# The SDK retries timeouts, connection errors, 429s and 5xx itself (exponential backoff with
+# jitter, honoring Retry-After); other 4xx are never retried. Calls that need a different
+# budget override it with with_options() or timeout=.
+OPENAI_MAX_RETRIES = int(os.environ.get("OPENAI_MAX_RETRIES", "3"))
+OPENAI_TIMEOUT = httpx.Timeout(20.0, connect=3.0)
+# One pooled client for the whole process. httpx drops idle connections after 5s by default,
+# which made every sync/query burst minutes apart pay a fresh TLS handshake; keep them longer
+# (a connection the server already closed is just retried by the SDK).
+OPENAI_HTTP_LIMITS = httpx.Limits(max_connections=50, max_keepalive_connections=20, keepalive_expiry=60.0)
+ai_client = OpenAI(
+    api_key=OPENAI_API_KEY,
+    max_retries=OPENAI_MAX_RETRIES,
+    timeout=OPENAI_TIMEOUT,
+    http_client=DefaultHttpxClient(limits=OPENAI_HTTP_LIMITS)
+) if OPENAI_API_KEY else None
+
+# User-facing chat completions: time out just above typical latency and retry once on a
+# fresh connection rather than waiting out a straggler
+OPENAI_CHAT_TIMEOUT = float(os.environ.get("OPENAI_CHAT_TIMEOUT", "8"))
+OPENAI_CHAT_RETRIES = int(os.environ.get("OPENAI_CHAT_RETRIES", "1"))
+# Output caps: generation time grows with output length, and Slack answers rarely need more
+OPENAI_ANSWER_MAX_TOKENS = int(os.environ.get("OPENAI_ANSWER_MAX_TOKENS", "500"))
+OPENAI_PARSER_MAX_TOKENS = 300  # The email parser only returns a small JSON object
 
 # OpenAI Model Config (default to gpt-4o-mini, fallback to gpt-3.5-turbo)
 OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")  # Options: gpt-3.5-turbo, gpt-4o-mini, gpt-4-turbo
@@ -39,24 +112,90 @@ OPENAI_MODEL = os.environ.get("OPENAI_MODEL", "gpt-4o-mini")  # Options: gpt-3.5
 ASSISTANT_ID = os.environ.get("OPENAI_ASSISTANT_ID")  # Will be created if not exists
 VECTOR_STORE_ID = os.environ.get("OPENAI_VECTOR_STORE_ID")  # Will be created if not exists
 
+# Semantic answer cache for the assistant (near-duplicate questions reuse a recent answer)
+OPENAI_EMBEDDING_MODEL = os.environ.get("OPENAI_EMBEDDING_MODEL", "text-embedding-3-small")
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get("SEMANTIC_CACHE_THRESHOLD", "0.92"))  # Cosine similarity
+SEMANTIC_CACHE_TTL = int(os.environ.get("SEMANTIC_CACHE_TTL", "900"))  # Seconds; short since chat logs keep changing
+
+# --- JSON HELPERS ---
+def _json_loads(content):
+    """Parse a JSON document (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return orjson.loads(content)
+    return json.loads(content)
+
+def _json_dumps(data, pretty=True):
+    """Serialize data to a JSON string (uses orjson when installed)"""
+    if ORJSON_AVAILABLE:
+        return _json_dumpb(data, pretty).decode()
+    if pretty:
+        return json.dumps(data, indent=2)
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+def _json_dumpb(data, pretty=True):
+    """Serialize data to UTF-8 JSON bytes, for files and uploads (no str round trip with orjson)"""
+    if ORJSON_AVAILABLE:
+        option = orjson.OPT_INDENT_2 if pretty else 0
+        return orjson.dumps(data, option=option)
+    return _json_dumps(data, pretty).encode("utf-8")
+
 # --- CONFIGURATION LOADING ---
+# Last parsed config and the source version it came from (CONFIG_JSON text or config.json stat)
+_CONFIG_CACHE = {"key": None, "data": None, "pending": None}
+_CONFIG_CACHE_LOCK = threading.Lock()
+_CONFIG_WRITE_LOCK = threading.Lock()  # One writer on config.json(.tmp) at a time
+
+def _config_source_key():
+    config_json = os.environ.get("CONFIG_JSON")
+    if config_json:
+        return ("env", config_json)
+    try:
+        st = os.stat("config.json")
+        return ("file", st.st_mtime_ns, st.st_size)
+    except OSError:
+        return ("missing",)
+
+def _invalidate_config_cache():
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE["key"] = None
+        _CONFIG_CACHE["data"] = None
+
 def load_config():
-    """Loads the channel map and settings from environment variable or config.json"""
+    """Loads the channel map and settings from environment variable or config.json
+    
+    The parse is cached until the source changes; every call returns its own deep copy,
+    so callers can edit it and pass it to save_config().
+    """
+    key = _config_source_key()
+    with _CONFIG_CACHE_LOCK:
+        # A queued background write is newer than the file on disk
+        if _CONFIG_CACHE["pending"] is not None:
+            return copy.deepcopy(_CONFIG_CACHE["pending"])
+        if _CONFIG_CACHE["key"] == key:
+            return copy.deepcopy(_CONFIG_CACHE["data"])
+    
+    config = _load_config_uncached()
+    with _CONFIG_CACHE_LOCK:
+        _CONFIG_CACHE["key"] = key
+        _CONFIG_CACHE["data"] = config
+    return copy.deepcopy(config)
+
+def _load_config_uncached():
     # First, try to load from environment variable (for Render/secrets)
     config_json = os.environ.get("CONFIG_JSON")
     if config_json:
         try:
-            config = json.loads(config_json)
+            config = _json_loads(config_json)
             print("✅ Loaded config from CONFIG_JSON environment variable")
             return config
         except json.JSONDecodeError as e:
-            print(f"❌ Error parsing CONFIG_JSON: {e}")
+            logger.error("❌ Error parsing CONFIG_JSON: %s", e)
             print("⚠️ Falling back to config.json file...")
     
     # Fallback to config.json file (for local development)
     try:
-        with open("config.json", "r") as f:
-            config = json.load(f)
+        with open("config.json", "rb") as f:
+            config = _json_loads(f.read())
             print("✅ Loaded config from config.json file")
             return config
     except FileNotFoundError:
@@ -64,7 +203,7 @@ def load_config():
         print("⚠️ Using default empty configuration.")
         return {"settings": {}, "roles": {}, "channel_map": {}}
     except json.JSONDecodeError as e:
-        print(f"❌ Error parsing config.json: {e}")
+        logger.error("❌ Error parsing config.json: %s", e)
         return {"settings": {}, "roles": {}, "channel_map": {}}
 
 # Load the config once when the app starts
@@ -75,22 +214,22 @@ def load_prompts():
     prompts_json = os.environ.get("PROMPTS_JSON")
     if prompts_json:
         try:
-            prompts = json.loads(prompts_json)
+            prompts = _json_loads(prompts_json)
             print("✅ Loaded prompts from PROMPTS_JSON environment variable")
             return prompts
         except json.JSONDecodeError as e:
-            print(f"❌ Error parsing PROMPTS_JSON: {e}")
+            logger.error("❌ Error parsing PROMPTS_JSON: %s", e)
     
     try:
-        with open("prompts.json", "r") as f:
-            prompts = json.load(f)
+        with open("prompts.json", "rb") as f:
+            prompts = _json_loads(f.read())
             print("✅ Loaded prompts from prompts.json file")
             return prompts
     except FileNotFoundError:
         print("⚠️ prompts.json not found. Using default prompts.")
         return {"system_prompts": {}, "data_retrieval_rules": {}, "email_processing_prompt": {}}
     except json.JSONDecodeError as e:
-        print(f"❌ Error parsing prompts.json: {e}")
+        logger.error("❌ Error parsing prompts.json: %s", e)
         return {"system_prompts": {}, "data_retrieval_rules": {}, "email_processing_prompt": {}}
 
 app_prompts = load_prompts()
@@ -121,154 +260,508 @@ def _build_authorized_users():
     
     return authorized, external_authorized
 
+def _lowercase_email_sets():
+    """Lowercased frozensets of the authorized lists for O(1) checks in is_user_authorized"""
+    return (frozenset(e.lower() for e in AUTHORIZED_USERS),
+            frozenset(e.lower() for e in EXTERNAL_AUTHORIZED_USERS))
+
 AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS = _build_authorized_users()
+_AUTHORIZED_EMAILS_LC, _EXTERNAL_AUTHORIZED_EMAILS_LC = _lowercase_email_sets()
 
 
 # --- DATABASE FUNCTIONS (GIST) ---
 GIST_FILENAME_PROJECTS = "projects.json"       # PM Notes (Protected)
 GIST_FILENAME_KB = "knowledgebase.json"        # Chat Logs (Bot managed)
-
-def load_gist_file(filename):
-    """Generic helper to load any file from Gist"""
+_GIST_API_URL = f"https://api.github.com/gists/{GIST_ID}"
+
+# One keep-alive session for all GitHub calls (saves a TCP+TLS handshake per request)
+_HTTP = requests.Session()
+_HTTP.mount("https://", HTTPAdapter(
+    pool_connections=4,
+    pool_maxsize=8,
+    max_retries=Retry(total=3, backoff_factor=0.2, status_forcelist=(502, 503, 504))
+))
+# Auth headers are set once here instead of rebuilt for every call
+_HTTP.headers.update({"Authorization": f"token {GITHUB_TOKEN}", "Accept": "application/vnd.github.v3+json"})
+
+# Last Gist response, revalidated with If-None-Match so unchanged reads cost a 304.
+# Readonly loads skip even that for GIST_CACHE_TTL seconds; our own writes invalidate it
+# (and are served from the pending queue until then), so only outside edits can lag.
+GIST_CACHE_TTL = float(os.environ.get("GIST_CACHE_TTL", "30"))
+_GIST_LOCK = threading.Lock()
+_GIST_ETAG = None
+_GIST_CACHE = None
+_GIST_VALIDATED_AT = 0.0
+_GIST_GENERATION = 0  # Bumped by every invalidation, so a fetch that raced a write isn't cached
+
+def get_gist_content(max_age=0):
+    """Fetch the Gist's files, reusing the cached copy when GitHub answers 304 Not Modified
+    
+    Args:
+        max_age: Return the cached copy without asking GitHub if it was validated
+            less than this many seconds ago
+    """
+    global _GIST_ETAG, _GIST_CACHE, _GIST_VALIDATED_AT
     if not GITHUB_TOKEN or not GIST_ID: return None
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    try:
-        response = requests.get(f"https://api.github.com/gists/{GIST_ID}", headers=headers, timeout=10)
-        if response.status_code == 200:
-            files = response.json()["files"]
-            if filename in files:
-                content = files[filename]["content"]
-                return json.loads(content)
-    except Exception as e:
-        print(f"❌ Error loading {filename}: {e}")
+    
+    with _GIST_LOCK:
+        etag, cached, generation = _GIST_ETAG, _GIST_CACHE, _GIST_GENERATION
+        if cached is not None and time.monotonic() - _GIST_VALIDATED_AT < max_age:
+            return cached
+    headers = {"If-None-Match": etag} if etag and cached is not None else None
+    
+    response = _HTTP.get(_GIST_API_URL, headers=headers, timeout=10)
+    if response.status_code == 304 and cached is not None:
+        with _GIST_LOCK:
+            if _GIST_GENERATION == generation:
+                _GIST_VALIDATED_AT = time.monotonic()
+        return cached
+    if response.status_code == 200:
+        files = response.json()["files"]
+        with _GIST_LOCK:
+            if _GIST_GENERATION == generation:
+                _GIST_ETAG = response.headers.get("ETag")
+                _GIST_CACHE = files
+                _GIST_VALIDATED_AT = time.monotonic()
+        return files
+    
+    logger.error("❌ Error loading Gist: %s", response.status_code)
     return None
 
+def _invalidate_gist_cache():
+    """Drop the cached Gist so the next read refetches it (call after every write)"""
+    global _GIST_ETAG, _GIST_CACHE, _GIST_GENERATION
+    with _GIST_LOCK:
+        _GIST_ETAG = None
+        _GIST_CACHE = None
+        _GIST_GENERATION += 1
+
+# Pending Gist writes ({filename: content}), sent together by flush_gist_writes()
+_PENDING_GIST_WRITES = {}
+_GIST_WRITE_LOCK = threading.Lock()
+_GIST_FLUSH_LOCK = threading.Lock()  # Keeps PATCHes in order so an older flush never lands last
+_GIST_FLUSH_QUEUED = False  # A flush is already submitted and hasn't snapshotted the queue yet
+_GIST_FLUSH_FUTURE = None
+
+# Gist writes run here so Slack handlers never wait on the GitHub PATCH
+_WRITE_POOL = ThreadPoolExecutor(max_workers=2, thread_name_prefix="gist-write")
+
+# Parsed file per filename as (content, data); only handed out to readonly callers
+_PARSED_GIST_FILES = {}
+
+def _parse_gist_file(filename, files, readonly=False):
+    """Parse one file, preferring a queued write over the fetched Gist copy
+    
+    Args:
+        readonly: Return the shared parsed object for this exact content instead of
+            a fresh parse. Callers must not mutate it.
+    """
+    # A queued write is newer than anything GitHub has
+    with _GIST_WRITE_LOCK:
+        content = _PENDING_GIST_WRITES.get(filename)
+    if content is None:
+        if not files or filename not in files:
+            return None
+        file_info = files[filename]
+        if file_info.get("truncated"):
+            _fetch_full_gist_file(file_info)
+        content = file_info["content"]
+    
+    if not readonly:
+        return _json_loads(content)
+    with _GIST_LOCK:
+        entry = _PARSED_GIST_FILES.get(filename)
+    # Same string object means same Gist revision (or same queued write)
+    if entry and entry[0] is content:
+        return entry[1]
+    data = _json_loads(content)
+    with _GIST_LOCK:
+        _PARSED_GIST_FILES[filename] = (content, data)
+    return data
+
+def _is_shared_parse(data):
+    """True if data is a shared readonly parse (see _parse_gist_file), which nobody mutates"""
+    with _GIST_LOCK:
+        return any(entry[1] is data for entry in _PARSED_GIST_FILES.values())
+
+def _fetch_full_gist_file(file_info):
+    """Fetch the whole body of a file the Gist API truncated (over ~1 MB)
+    
+    raw_url is pinned to the Gist revision we already have, so it can't be stale.
+    The full content is written back into the cached entry so 304 reads reuse it.
+    """
+    response = _HTTP.get(file_info["raw_url"], timeout=10)
+    response.raise_for_status()
+    with _GIST_LOCK:
+        file_info["content"] = response.text
+        file_info["truncated"] = False
+
+def load_gist_file(filename, readonly=False):
+    """Generic helper to load any file from Gist"""
+    return load_gist_files([filename], readonly)[0]
+
+def load_gist_files(filenames, readonly=False):
+    """Load several Gist files from a single fetch
+    
+    Args:
+        filenames: Gist file names to load
+        readonly: Share the cached parsed objects (see _parse_gist_file); True for all
+            files, or a collection of the filenames the caller won't mutate
+    
+    Returns:
+        list: Parsed data per filename (None for missing/unreadable files)
+    """
+    files = None
+    with _GIST_WRITE_LOCK:
+        need_fetch = any(name not in _PENDING_GIST_WRITES for name in filenames)
+    if need_fetch:
+        try:
+            # Callers that will write back always revalidate; pure readers accept a recent copy
+            files = get_gist_content(max_age=GIST_CACHE_TTL if readonly is True else 0)
+        except Exception as e:
+            logger.error("❌ Error loading Gist: %s", e)
+    
+    results = []
+    for filename in filenames:
+        try:
+            shared = readonly if isinstance(readonly, bool) else filename in readonly
+            results.append(_parse_gist_file(filename, files, shared))
+        except Exception as e:
+            logger.error("❌ Error loading %s: %s", filename, e)
+            results.append(None)
+    return results
+
 def save_gist_file(filename, data):
-    """Generic helper to save any file to Gist"""
-    if not GITHUB_TOKEN or not GIST_ID: return
-    headers = {"Authorization": f"token {GITHUB_TOKEN}", "Accept": "application/vnd.github.v3+json"}
-    payload = {"files": {filename: {"content": json.dumps(data, indent=2)}}}
-    try:
-        requests.patch(f"https://api.github.com/gists/{GIST_ID}", json=payload, headers=headers)
-    except Exception as e:
-        print(f"❌ Error saving {filename}: {e}")
+    """Generic helper to save any file to Gist
+    
+    The write is queued and coalesced with other saves; a background flush sends all
+    pending files in a single PATCH, so a burst of edits costs one request.
+    
+    Returns:
+        Future: Resolves to True once nothing is left pending (None if Gist isn't configured)
+    """
+    global _GIST_FLUSH_QUEUED, _GIST_FLUSH_FUTURE
+    if not GITHUB_TOKEN or not GIST_ID: return None
+    # Minified: GitHub stores and re-serves every byte, and nobody reads these by hand
+    content = _json_dumps(data, pretty=False)
+    with _GIST_WRITE_LOCK:
+        _PENDING_GIST_WRITES[filename] = content
+        if not _GIST_FLUSH_QUEUED:
+            # Saves that land before the flush snapshots the queue ride along with it
+            _GIST_FLUSH_QUEUED = True
+            _GIST_FLUSH_FUTURE = _WRITE_POOL.submit(_flush_task)
+        return _GIST_FLUSH_FUTURE
+
+def _flush_task():
+    """Background flush submitted by save_gist_file"""
+    global _GIST_FLUSH_QUEUED
+    with _GIST_WRITE_LOCK:
+        _GIST_FLUSH_QUEUED = False
+    return flush_gist_writes()
+
+def flush_gist_writes():
+    """Send every pending file write to the Gist in one PATCH
+    
+    Returns:
+        bool: True if nothing is left pending
+    """
+    if not GITHUB_TOKEN or not GIST_ID: return True
+    
+    with _GIST_FLUSH_LOCK:
+        with _GIST_WRITE_LOCK:
+            pending = dict(_PENDING_GIST_WRITES)
+        if not pending:
+            return True
+        
+        payload = {"files": {name: {"content": content} for name, content in pending.items()}}
+        try:
+            # Encoded here (orjson when installed) rather than by requests' stdlib json, which
+            # would re-escape every file's content in pure Python dispatch
+            response = _HTTP.patch(_GIST_API_URL, data=_json_dumpb(payload, pretty=False),
+                                   headers={"Content-Type": "application/json"}, timeout=10)
+        except Exception as e:
+            logger.error("❌ Error saving %s: %s", ', '.join(pending), e)
+            return False
+        
+        if response.status_code not in (200, 201):
+            # Keep the writes queued (reads keep serving them) so nothing GitHub rejected is
+            # reported as saved; the next flush retries. 4xx like a bad token won't fix itself,
+            # so those are logged at error level with the files still waiting.
+            logger.error("❌ Gist rejected save of %s: %s - %s", ", ".join(pending),
+                         response.status_code, response.text)
+            return False
+        _invalidate_gist_cache()
+        
+        # Drop the writes we sent, unless a newer save replaced them meanwhile
+        with _GIST_WRITE_LOCK:
+            for name, content in pending.items():
+                if _PENDING_GIST_WRITES.get(name) is content:
+                    del _PENDING_GIST_WRITES[name]
+            return not _PENDING_GIST_WRITES
+
+# Don't lose queued writes on a clean shutdown
+atexit.register(flush_gist_writes)
 
 # 1. Projects DB (Structured Data)
-def load_db():
-    data = load_gist_file(GIST_FILENAME_PROJECTS)
+def load_db(readonly=False):
+    data = load_gist_file(GIST_FILENAME_PROJECTS, readonly)
     return data if data is not None else []
 
 def save_db(data):
-    save_gist_file(GIST_FILENAME_PROJECTS, data)
+    future = save_gist_file(GIST_FILENAME_PROJECTS, data)
+    # Cached answers were computed from the old project data
+    _assistant_cache.clear()
+    return future
+
+def on_save_done(future, what, on_success=None, on_failure=None):
+    """Report how a queued Gist save ends (the callbacks run on the write pool)
+    
+    Args:
+        future: What save_db/save_kb returned (None means Gist isn't configured)
+        what: Description for the log, e.g. "project 'Acme'"
+        on_success / on_failure: Optional no-argument callbacks
+    """
+    def done(f):
+        try:
+            ok = f.result()
+        except Exception:
+            logger.exception("❌ Saving %s to the Gist raised", what)
+            ok = False
+        try:
+            if ok:
+                if on_success:
+                    on_success()
+            else:
+                logger.error("❌ Saving %s to the Gist failed (still queued, retried on the next flush)", what)
+                if on_failure:
+                    on_failure()
+        except Exception:
+            logger.exception("❌ Save callback for %s failed", what)
+    
+    if future is None:
+        logger.error("❌ Not saving %s: Gist isn't configured", what)
+        if on_failure:
+            on_failure()
+    else:
+        future.add_done_callback(done)
+
+def _notify_save_failed(client, user_id, what):
+    """DM a user that their change didn't reach the database"""
+    if not user_id:
+        return
+    client.chat_postMessage(
+        channel=user_id,
+        text=f"❌ Couldn't save {what} to the database. It will be retried, but please check it later."
+    )
+
+# Lowercased client name -> projects, for the last readonly list indexed. Readonly loads
+# hand out the same list until the data changes, so the index is rebuilt only on a new
+# version. Lists a caller may edit aren't memoized: an edit would leave the index stale.
+_PROJECT_INDEX = {"source": None, "index": {}}
+_PROJECT_INDEX_LOCK = threading.Lock()
+
+def projects_by_client(projects):
+    """Index projects by lowercased client name (treat the result as read-only)
+    
+    Args:
+        projects: Project list, ideally from load_db(readonly=True)
+    
+    Returns:
+        dict: {client_name_lower: [project, ...]}
+    """
+    with _PROJECT_INDEX_LOCK:
+        if _PROJECT_INDEX["source"] is projects:
+            return _PROJECT_INDEX["index"]
+    
+    index = {}
+    for p in projects:
+        index.setdefault(p.get('client', '').lower(), []).append(p)
+    if not _is_shared_parse(projects):
+        return index
+    with _PROJECT_INDEX_LOCK:
+        _PROJECT_INDEX["source"] = projects
+        _PROJECT_INDEX["index"] = index
+    return index
+
+# Category -> projects for the last list grouped, memoized the same way as the client index
+_CATEGORY_INDEX = {"source": None, "grouped": {}}
+
+def _categorize(projects):
+    """Group projects by category in one pass (treat the result as read-only)
+    
+    Args:
+        projects: Project list, ideally from load_db(readonly=True)
+    
+    Returns:
+        dict: {category: [project, ...]}, projects without a category under 'Other'
+    """
+    with _PROJECT_INDEX_LOCK:
+        if _CATEGORY_INDEX["source"] is projects:
+            return _CATEGORY_INDEX["grouped"]
+    
+    grouped = {}
+    for p in projects:
+        grouped.setdefault(p.get('category', 'Other'), []).append(p)
+    if not _is_shared_parse(projects):
+        return grouped
+    with _PROJECT_INDEX_LOCK:
+        _CATEGORY_INDEX["source"] = projects
+        _CATEGORY_INDEX["grouped"] = grouped
+    return grouped
 
 # 2. Knowledge Base (Chat Logs)
-def load_kb():
-    data = load_gist_file(GIST_FILENAME_KB)
+def load_kb(readonly=False):
+    data = load_gist_file(GIST_FILENAME_KB, readonly)
     return data if data is not None else {}
 
 def save_kb(data):
-    save_gist_file(GIST_FILENAME_KB, data)
+    return save_gist_file(GIST_FILENAME_KB, data)
 
 # --- HELPER: CONFIG MANAGEMENT ---
-def save_config(config):
+# Background config.json writes; a single worker keeps them in submission order
+_CONFIG_WRITE_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cfg-io")
+
+def _write_config_file(config):
+    """Write config.json atomically (temp file + rename) so a crash can't leave it half-written"""
+    try:
+        with _CONFIG_WRITE_LOCK:
+            with open("config.json.tmp", "wb") as f:
+                f.write(_json_dumpb(config))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace("config.json.tmp", "config.json")
+        logger.info("✅ Config saved successfully to config.json")
+        return True
+    except Exception:
+        logger.exception("❌ Error saving config")
+        return False
+    finally:
+        with _CONFIG_CACHE_LOCK:
+            if _CONFIG_CACHE["pending"] is config:
+                _CONFIG_CACHE["pending"] = None
+            _CONFIG_CACHE["key"] = None
+            _CONFIG_CACHE["data"] = None
+
+def _apply_config(config):
+    """Point the module-level settings at a new config"""
+    global app_config, SETTINGS, MAILBOX_CHANNEL_ID, MAIN_CHANNEL_ID, CHANNEL_MAP, ROLES
+    global AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS
+    global _AUTHORIZED_EMAILS_LC, _EXTERNAL_AUTHORIZED_EMAILS_LC
+    global SHOPLINE_INTERNAL_CHANNEL_ID, SHOPLINE_PARTNER_CHANNEL_ID
+    
+    app_config = config
+    SETTINGS = config.get("settings", {})
+    MAILBOX_CHANNEL_ID = SETTINGS.get("mailbox_channel_id")
+    MAIN_CHANNEL_ID = SETTINGS.get("main_channel_id")
+    SHOPLINE_INTERNAL_CHANNEL_ID = SETTINGS.get("shopline_internal_channel_id")
+    SHOPLINE_PARTNER_CHANNEL_ID = SETTINGS.get("shopline_partner_channel_id")
+    ROLES = config.get("roles", {})
+    CHANNEL_MAP = config.get("channel_map", {})
+    invalidate_request_context()
+    AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS = _build_authorized_users()
+    _AUTHORIZED_EMAILS_LC, _EXTERNAL_AUTHORIZED_EMAILS_LC = _lowercase_email_sets()
+
+def save_config(config, background=False, on_failure=None):
     """Save config to file and update in-memory variables
     
     Note: If using CONFIG_JSON environment variable, you'll need to update it manually
     in your deployment platform (e.g., Render) after making changes here.
-    """
-    global app_config, SETTINGS, MAILBOX_CHANNEL_ID, MAIN_CHANNEL_ID, CHANNEL_MAP, ROLES
-    global AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS
-    global SHOPLINE_INTERNAL_CHANNEL_ID, SHOPLINE_PARTNER_CHANNEL_ID
     
-    try:
-        # Save to config.json file
-        with open("config.json", "w") as f:
-            json.dump(config, f, indent=2)
-        
-        # Update in-memory variables
-        app_config = config
-        SETTINGS = config.get("settings", {})
-        MAILBOX_CHANNEL_ID = SETTINGS.get("mailbox_channel_id")
-        MAIN_CHANNEL_ID = SETTINGS.get("main_channel_id")
-        SHOPLINE_INTERNAL_CHANNEL_ID = SETTINGS.get("shopline_internal_channel_id")
-        SHOPLINE_PARTNER_CHANNEL_ID = SETTINGS.get("shopline_partner_channel_id")
-        ROLES = config.get("roles", {})
-        CHANNEL_MAP = config.get("channel_map", {})
-        AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS = _build_authorized_users()
-        
-        print("✅ Config saved successfully to config.json")
+    Args:
+        background: Apply the config in memory now and queue the disk write, so a Slack
+            handler doesn't wait on the fsync. load_config() serves the queued copy
+            until the write lands.
+        on_failure: With background, a no-argument callback run (on the write worker)
+            if the queued write fails, since the return value can't report it
+    
+    Returns:
+        True if saved (or queued), False if the write failed
+    """
+    if not background:
+        if not _write_config_file(config):
+            return False
+        _apply_config(config)
         print("⚠️ If using CONFIG_JSON environment variable, update it in your deployment platform")
         return True
-    except Exception as e:
-        print(f"❌ Error saving config: {e}")
-        import traceback
-        traceback.print_exc()
-        return False
+    
+    snapshot = copy.deepcopy(config)
+    # With CONFIG_JSON set the file isn't what load_config() reads, so don't shadow it
+    if _config_source_key()[0] != "env":
+        with _CONFIG_CACHE_LOCK:
+            _CONFIG_CACHE["pending"] = snapshot
+    _apply_config(config)
+    
+    def write():
+        if not _write_config_file(snapshot) and on_failure:
+            try:
+                on_failure()
+            except Exception:
+                logger.exception("❌ Config write failure callback raised")
+    
+    _CONFIG_WRITE_POOL.submit(write)
+    print("⚠️ If using CONFIG_JSON environment variable, update it in your deployment platform")
+    return True
 
 def reload_config():
     """Reload config from file/environment"""
-    global app_config, app_prompts, SETTINGS, MAILBOX_CHANNEL_ID, MAIN_CHANNEL_ID
-    global CHANNEL_MAP, ROLES, AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS
-    global SHOPLINE_INTERNAL_CHANNEL_ID, SHOPLINE_PARTNER_CHANNEL_ID
+    global app_prompts
     
-    app_config = load_config()
+    _invalidate_config_cache()
+    # Let a queued admin write land first so this reads the saved file
+    _CONFIG_WRITE_POOL.submit(lambda: None).result()
     app_prompts = load_prompts()
+    _build_system_prompt.cache_clear()
+    invalidate_user_email()
     
-    SETTINGS = app_config.get("settings", {})
-    MAILBOX_CHANNEL_ID = SETTINGS.get("mailbox_channel_id")
-    MAIN_CHANNEL_ID = SETTINGS.get("main_channel_id")
-    SHOPLINE_INTERNAL_CHANNEL_ID = SETTINGS.get("shopline_internal_channel_id")
-    SHOPLINE_PARTNER_CHANNEL_ID = SETTINGS.get("shopline_partner_channel_id")
-    ROLES = app_config.get("roles", {})
-    CHANNEL_MAP = app_config.get("channel_map", {})
-    AUTHORIZED_USERS, EXTERNAL_AUTHORIZED_USERS = _build_authorized_users()
+    _apply_config(load_config())
     
     print("✅ Config and prompts reloaded")
 
 
 # --- APP SETUP ---
-app = App(token=SLACK_BOT_TOKEN, signing_secret=SLACK_SIGNING_SECRET)
+# Bolt acks on the request thread and runs listeners on this pool, so the WSGI worker is
+# free as soon as ack() returns. Bolt's default pool has 5 threads, which a few slow AI
+# handlers can fill, queueing every other listener behind them.
+SLACK_LISTENER_WORKERS = int(os.environ.get("SLACK_LISTENER_WORKERS", "16"))
+app = App(
+    token=SLACK_BOT_TOKEN,
+    signing_secret=SLACK_SIGNING_SECRET,
+    listener_executor=ThreadPoolExecutor(max_workers=SLACK_LISTENER_WORKERS, thread_name_prefix="bolt-listener")
+)
 flask_app = Flask(__name__)
 handler = SlackRequestHandler(app)
 
-# --- DATABASE FUNCTIONS ---
-def load_db():
-    if not GITHUB_TOKEN or not GIST_ID: return []
-    headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-    try:
-        response = requests.get(f"https://api.github.com/gists/{GIST_ID}", headers=headers, timeout=10)
-        if response.status_code == 200:
-            content = response.json()["files"][GIST_FILENAME]["content"]
-            return json.loads(content)
-    except Exception as e:
-        print(f"❌ Error loading DB: {e}")
-    return []
+# --- HELPER: CONTEXT SECURITY ---
+# channel_id -> request context, until the channel map changes (save_config/reload_config)
+_REQUEST_CONTEXT_CACHE = {}
 
-def save_db(data):
-    if not GITHUB_TOKEN or not GIST_ID: return
-    headers = {"Authorization": f"token {GITHUB_TOKEN}", "Accept": "application/vnd.github.v3+json"}
-    payload = {"files": {GIST_FILENAME: {"content": json.dumps(data, indent=2)}}}
-    try:
-        response = requests.patch(f"https://api.github.com/gists/{GIST_ID}", json=payload, headers=headers)
-        if response.status_code not in [200, 201]:
-            print(f"❌ Error saving to Gist: {response.status_code} - {response.text}")
-            raise Exception(f"Gist save failed: {response.status_code}")
-        return True
-    except Exception as e:
-        print(f"❌ Error saving: {e}")
-        raise e
+def invalidate_request_context(channel_id=None):
+    """Forget the cached context for one channel (or all channels)"""
+    if channel_id is None:
+        _REQUEST_CONTEXT_CACHE.clear()
+    else:
+        _REQUEST_CONTEXT_CACHE.pop(channel_id, None)
 
-# --- HELPER: CONTEXT SECURITY ---
 def get_request_context(channel_id):
-    """Determines if the request is Internal (Full Access) or External (Restricted)."""
+    """Determines if the request is Internal (Full Access) or External (Restricted).
+    
+    The returned dict is cached per channel and shared between callers: don't mutate it.
+    """
+    context = _REQUEST_CONTEXT_CACHE.get(channel_id)
+    if context is not None:
+        return context
+    
     channel_info = CHANNEL_MAP.get(channel_id, {})
     if channel_info:
-        return {
+        context = {
             "client": channel_info.get("client"),
             "role": "external" if channel_info.get("type") == "external" else "internal"
         }
-    # Default to internal if unknown/DM
-    return {"client": None, "role": "internal"}
+    else:
+        # Default to internal if unknown/DM
+        context = {"client": None, "role": "internal"}
+    _REQUEST_CONTEXT_CACHE[channel_id] = context
+    return context
 
 def get_user_role(user_email):
     """Determine user's role based on their email address.
@@ -332,6 +825,30 @@ def is_superadmin(user_email):
     """Check if user is a superadmin (internal team member)"""
     return get_user_role(user_email) == "internal"
 
+# System prompt + project data, as sent to the chat completions
+_PROMPT_TEMPLATE = "{system_prompt}\n\nPROJECT DATA:\n{data_context}"
+_PROMPT_WITH_NOTE_TEMPLATE = "{system_prompt}\n\n{note}\n\nPROJECT DATA:\n{data_context}"
+
+# Slack formatting instructions appended to every system prompt
+_SLACK_FORMATTING_RULES = (
+    "\n\nFORMATTING RULES (You are responding in Slack):\n"
+    "- Use *bold* for emphasis (NOT **bold**)\n"
+    "- Use _italic_ for emphasis (NOT *italic*)\n"
+    "- Use bullet points with • or -\n"
+    "- Use numbered lists: 1. 2. 3.\n"
+    "- Use `code` for technical terms\n"
+    "- Use > for quotes\n"
+    "- Keep responses concise and scannable\n"
+    "- Use emojis sparingly for visual breaks (✅ ❌ 📌 🔴 🟢)\n"
+    "- Do NOT use ### or #### for headers - use *Bold Title* instead\n"
+    "- Do NOT use [text](url) format - just paste the URL directly\n\n"
+    "RESPONSE STRUCTURE:\n"
+    "When providing status reports or answering complex questions, split your answer into two sections:\n"
+    "1. *Structured Data by PMs* (from projects.json/structured data)\n"
+    "2. *Channels* (from Slack/Email logs)\n"
+    "If a section has no relevant info, you can omit it."
+)
+
 def get_system_prompt(user_email, client_name=None):
     """Get the appropriate system prompt based on user role.
     
@@ -343,6 +860,16 @@ def get_system_prompt(user_email, client_name=None):
         str: The system prompt for the user's role
     """
     role = get_user_role(user_email)
+    user_first_name = None
+    if role == "merchant":
+        user_first_name = user_email.split("@")[0].split(".")[0].title() if user_email else "User"
+    else:
+        client_name = None  # Only the merchant prompt mentions the client
+    return _build_system_prompt(role, client_name, user_first_name)
+
+@functools.lru_cache(maxsize=256)
+def _build_system_prompt(role, client_name, user_first_name):
+    """Assemble the system prompt (cached; reload_config() clears it when the prompts change)"""
     prompts = app_prompts.get("system_prompts", {})
     retrieval_rules = app_prompts.get("data_retrieval_rules", {})
     
@@ -360,7 +887,6 @@ def get_system_prompt(user_email, client_name=None):
         template = prompts.get("merchant_client", {}).get("prompt",
             "You are a dedicated Project Assistant for {client_name}. Be professional and helpful.")
         # Fill in template variables
-        user_first_name = user_email.split("@")[0].split(".")[0].title() if user_email else "User"
         base_prompt = template.format(
             client_name=client_name or "your project",
             user_first_name=user_first_name
@@ -370,29 +896,8 @@ def get_system_prompt(user_email, client_name=None):
         base_prompt = prompts.get("internal_admin", {}).get("prompt",
             "You are a Project Assistant. Be helpful and professional.")
     
-    # Slack formatting instructions
-    slack_formatting = (
-        "\n\nFORMATTING RULES (You are responding in Slack):\n"
-        "- Use *bold* for emphasis (NOT **bold**)\n"
-        "- Use _italic_ for emphasis (NOT *italic*)\n"
-        "- Use bullet points with • or -\n"
-        "- Use numbered lists: 1. 2. 3.\n"
-        "- Use `code` for technical terms\n"
-        "- Use > for quotes\n"
-        "- Keep responses concise and scannable\n"
-        "- Use emojis sparingly for visual breaks (✅ ❌ 📌 🔴 🟢)\n"
-        "- Do NOT use ### or #### for headers - use *Bold Title* instead\n"
-        "- Do NOT use [text](url) format - just paste the URL directly\n\n"
-        "RESPONSE STRUCTURE:\n"
-        "When providing status reports or answering complex questions, split your answer into two sections:\n"
-        "1. *Structured Data by PMs* (from projects.json/structured data)\n"
-        "2. *Channels* (from Slack/Email logs)\n"
-        "If a section has no relevant info, you can omit it."
-    )
-    
     # Combine with rules
-    full_prompt = f"{base_prompt}\n\n{general_rules}\n\n{security_warning}{slack_formatting}"
-    return full_prompt
+    return f"{base_prompt}\n\n{general_rules}\n\n{security_warning}{_SLACK_FORMATTING_RULES}"
 
 
 
@@ -420,16 +925,50 @@ def get_user_name(user_id):
     
     return user_id  # Return ID if we can't get name
 
+# Slack user ID -> (fetched_at, email); emails rarely change, so skip users_info for a while
+_EMAIL_CACHE = {}
+_EMAIL_CACHE_LOCK = threading.Lock()
+_EMAIL_CACHE_TTL = 600  # seconds
+_EMAIL_CACHE_MAX = 1024
+
 def get_user_email(user_id, client):
-    """Get user email from Slack user ID"""
+    """Get user email from Slack user ID (cached for _EMAIL_CACHE_TTL seconds)"""
+    now = time.monotonic()
+    with _EMAIL_CACHE_LOCK:
+        entry = _EMAIL_CACHE.get(user_id)
+    if entry and now - entry[0] < _EMAIL_CACHE_TTL:
+        return entry[1]
+    
     try:
         user_info = client.users_info(user=user_id)
         if user_info.get("ok"):
-            return user_info["user"].get("profile", {}).get("email", "")
+            email = user_info["user"].get("profile", {}).get("email", "")
+            with _EMAIL_CACHE_LOCK:
+                if len(_EMAIL_CACHE) >= _EMAIL_CACHE_MAX:
+                    _EMAIL_CACHE.clear()
+                _EMAIL_CACHE[user_id] = (now, email)
+            return email
+        with _EMAIL_CACHE_LOCK:
+            _EMAIL_CACHE.pop(user_id, None)
     except Exception as e:
-        print(f"❌ Error getting user email: {e}")
+        logger.error("❌ Error getting user email: %s", e)
     return None
 
+def invalidate_user_email(user_id=None):
+    """Forget the cached email for one user (or everyone)"""
+    with _EMAIL_CACHE_LOCK:
+        if user_id is None:
+            _EMAIL_CACHE.clear()
+        else:
+            _EMAIL_CACHE.pop(user_id, None)
+
+@app.event("user_change")
+def handle_user_change(event):
+    """Drop a user's cached email when their Slack profile changes"""
+    user_id = (event.get("user") or {}).get("id")
+    if user_id:
+        invalidate_user_email(user_id)
+
 def is_user_authorized(user_id, client, channel_id=None):
     """Check if user is authorized to use commands based on channel role
     
@@ -458,14 +997,13 @@ def is_user_authorized(user_id, client, channel_id=None):
         if role == 'external':
             # EXTERNAL CHANNEL - Check external authorization
             # If no external authorized users list, deny access (strict security)
-            if not EXTERNAL_AUTHORIZED_USERS or len(EXTERNAL_AUTHORIZED_USERS) == 0:
+            if not _EXTERNAL_AUTHORIZED_EMAILS_LC:
                 print(f"🚫 External channel access denied: No external_authorized_users configured")
                 print(f"   User: {user_email}, Channel: {channel_id}, Client: {target_client}")
                 return False
             
             # Check if user is in external authorized list
-            external_emails_lower = [email.lower() for email in EXTERNAL_AUTHORIZED_USERS]
-            is_authorized = user_email_lower in external_emails_lower
+            is_authorized = user_email_lower in _EXTERNAL_AUTHORIZED_EMAILS_LC
             
             if not is_authorized:
                 print(f"🚫 Unauthorized external access attempt by {user_email} (user_id: {user_id}, channel: {channel_id}, client: {target_client})")
@@ -476,13 +1014,12 @@ def is_user_authorized(user_id, client, channel_id=None):
         else:
             # INTERNAL CHANNEL - Check internal authorization
             # If no authorized users list, allow all (backward compatibility for internal)
-            if not AUTHORIZED_USERS or len(AUTHORIZED_USERS) == 0:
+            if not _AUTHORIZED_EMAILS_LC:
                 print(f"⚠️ No authorized_users configured - allowing all internal access (backward compatibility)")
                 return True
             
             # Check if user is in internal authorized list
-            internal_emails_lower = [email.lower() for email in AUTHORIZED_USERS]
-            is_authorized = user_email_lower in internal_emails_lower
+            is_authorized = user_email_lower in _AUTHORIZED_EMAILS_LC
             
             if not is_authorized:
                 print(f"🚫 Unauthorized internal access attempt by {user_email} (user_id: {user_id}, channel: {channel_id})")
@@ -493,12 +1030,11 @@ def is_user_authorized(user_id, client, channel_id=None):
     else:
         # No channel context - check internal list (default for commands without channel context)
         # If no authorized users list, allow all (backward compatibility)
-        if not AUTHORIZED_USERS or len(AUTHORIZED_USERS) == 0:
+        if not _AUTHORIZED_EMAILS_LC:
             return True
         
         # Check if email is in authorized list (case-insensitive)
-        authorized_emails_lower = [email.lower() for email in AUTHORIZED_USERS]
-        is_authorized = user_email_lower in authorized_emails_lower
+        is_authorized = user_email_lower in _AUTHORIZED_EMAILS_LC
         
         if not is_authorized:
             print(f"🚫 Unauthorized access attempt by {user_email} (user_id: {user_id}, no channel context)")
@@ -508,34 +1044,29 @@ def is_user_authorized(user_id, client, channel_id=None):
 def require_authorization(internal_only=False):
     """Decorator to require authorization for commands
     
+    Can be used bare (@require_authorization) or called (@require_authorization(internal_only=True)).
+    
     Args:
         internal_only: If True, only internal users can use this command (blocks external users)
     """
+    if callable(internal_only):
+        return require_authorization()(internal_only)
+    
     def decorator(func):
-        import functools
         @functools.wraps(func)
-        def wrapper(*args, **kwargs):
-            # Extract body and client from args/kwargs
-            body = None
-            client = None
-            
-            # Find body and client in args
-            for arg in args:
-                if isinstance(arg, dict) and 'user_id' in arg:
-                    body = arg
-                elif hasattr(arg, 'chat_postEphemeral'):
-                    client = arg
+        def wrapper(*args, body=None, client=None, ack=None, **kwargs):
+            # Bolt injects only the arguments the wrapped listener declares, so pass
+            # back exactly what we received
+            if body is not None: kwargs['body'] = body
+            if client is not None: kwargs['client'] = client
+            if ack is not None: kwargs['ack'] = ack
             
-            # Find in kwargs
             if not body:
-                body = kwargs.get('body')
-            if not client:
-                client = kwargs.get('client')
-            
-            if not body or not client:
-                # If we can't find them, just call the function (fallback)
+                # Not a Slack command payload, just call the function (fallback)
                 return func(*args, **kwargs)
             
+            # Listeners that don't take a client still need one for the auth check
+            slack_client = client or app.client
             user_id = body.get('user_id')
             channel_id = body.get('channel_id')
             
@@ -544,19 +1075,10 @@ def require_authorization(internal_only=False):
                 context = get_request_context(channel_id)
                 role = context.get('role', 'internal')
                 if role == 'external':
-                    # Try to ack if ack is in args
-                    ack = None
-                    for arg in args:
-                        if callable(arg) and arg.__name__ == 'ack':
-                            ack = arg
-                            break
-                    if not ack:
-                        ack = kwargs.get('ack')
-                    
                     if ack:
                         ack()
                     
-                    client.chat_postEphemeral(
+                    slack_client.chat_postEphemeral(
                         channel=channel_id,
                         user=user_id,
                         text=(
@@ -567,20 +1089,11 @@ def require_authorization(internal_only=False):
                     )
                     return
             
-            if not is_user_authorized(user_id, client, channel_id):
-                # Try to ack if ack is in args
-                ack = None
-                for arg in args:
-                    if callable(arg) and arg.__name__ == 'ack':
-                        ack = arg
-                        break
-                if not ack:
-                    ack = kwargs.get('ack')
-                
+            if not is_user_authorized(user_id, slack_client, channel_id):
                 if ack:
                     ack()
                 
-                client.chat_postEphemeral(
+                slack_client.chat_postEphemeral(
                     channel=channel_id,
                     user=user_id,
                     text=(
@@ -598,61 +1111,117 @@ def require_authorization(internal_only=False):
 # ==========================================
 # FEATURE: OPENAI ASSISTANTS & KNOWLEDGE BASE
 # ==========================================
+# Instructions for the knowledge base assistant (pushed to OpenAI only when they change)
+ASSISTANT_INSTRUCTIONS = (
+    "You are a Project Operations Assistant. You have two distinct data sources:\n"
+    "1. 'projects.json' (Structured Data): Project status, technical blockers, next steps. **DO NOT** use this for email/communication queries.\n"
+    "2. 'Slack Logs' (Communication History): Contains ALL raw emails and chat messages.\n\n"
+    "RESOURCE SELECTION RULES:\n"
+    "- If user asks about 'status', 'blockers', 'budget' -> Use 'projects.json'\n"
+    "- If user asks about 'email', 'what did they say', 'message', 'communication' -> **YOU MUST** use file_search on 'Slack Logs'.\n\n"
+    "EMAILS/COMMUNICATION INSTRUCTIONS:\n"
+    "- Emails are in 'Slack Logs' marked with '📂 Source: MAILBOX_INBOX (Email)'\n"
+    "- When asked 'What did X say?', search 'Slack Logs' for X's name.\n"
+    "- **NEVER** say 'I checked the status file'. If asked about communication, ONLY check the logs.\n"
+    "- Return the **full content** of the email/message when found."
+)
+
+# Verified (assistant_id, vector_store_id), reused until it expires so queries skip the setup round trips
+_ASSISTANT_HANDLE = {"ids": None, "expires": 0}
+_ASSISTANT_HANDLE_LOCK = threading.Lock()
+_ASSISTANT_HANDLE_TTL = 3600  # seconds
+
+# Last IDs setup verified, kept on disk so restarts (and other workers) reuse an assistant and
+# vector store created here instead of creating new ones when the env vars aren't set
+ASSISTANT_CACHE_FILE = ".assistant_cache.json"
+
+def _load_assistant_cache():
+    """Read the persisted {"assistant_id", "vector_store_id"} (None if missing/unreadable)"""
+    try:
+        with open(ASSISTANT_CACHE_FILE, "rb") as f:
+            cached = _json_loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable {ASSISTANT_CACHE_FILE}: {e}")
+        return None
+    return cached if isinstance(cached, dict) else None
+
+def _save_assistant_cache(assistant_id, vector_store_id):
+    """Persist verified IDs atomically (best effort)"""
+    try:
+        with open(ASSISTANT_CACHE_FILE + ".tmp", "wb") as f:
+            f.write(_json_dumpb({"assistant_id": assistant_id, "vector_store_id": vector_store_id}))
+        os.replace(ASSISTANT_CACHE_FILE + ".tmp", ASSISTANT_CACHE_FILE)
+    except Exception as e:
+        print(f"⚠️ Could not save {ASSISTANT_CACHE_FILE}: {e}")
+
 def setup_openai_assistant():
-    """Initialize or retrieve OpenAI Assistant with knowledge base (Robust Version)"""
-    global ASSISTANT_ID, VECTOR_STORE_ID # Update globals to persist in-memory across calls matches
+    """Initialize or retrieve OpenAI Assistant with knowledge base (Robust Version)
     
+    The verified IDs are memoized for _ASSISTANT_HANDLE_TTL seconds.
+    """
     if not ai_client:
         print("⚠️ OpenAI client not configured. Assistant features disabled.")
         return None, None
     
+    with _ASSISTANT_HANDLE_LOCK:
+        if _ASSISTANT_HANDLE["ids"] and time.monotonic() < _ASSISTANT_HANDLE["expires"]:
+            return _ASSISTANT_HANDLE["ids"]
+        ids = _setup_openai_assistant()
+        _ASSISTANT_HANDLE["ids"] = ids
+        _ASSISTANT_HANDLE["expires"] = time.monotonic() + _ASSISTANT_HANDLE_TTL
+        return ids
+
+def _setup_openai_assistant():
+    """Retrieve/create the assistant and vector store and make sure they're wired together"""
+    global ASSISTANT_ID, VECTOR_STORE_ID # Update globals to persist in-memory across calls matches
+    
     try:
         assistant = None
+        # Env vars win; otherwise pick up what an earlier run created
+        cached = _load_assistant_cache() or {}
+        if not ASSISTANT_ID:
+            ASSISTANT_ID = cached.get("assistant_id")
+        if not VECTOR_STORE_ID:
+            VECTOR_STORE_ID = cached.get("vector_store_id")
         current_vs_id = VECTOR_STORE_ID
         
         # 1. Retrieve or Create Assistant
         if ASSISTANT_ID:
             try:
                 assistant = ai_client.beta.assistants.retrieve(ASSISTANT_ID)
-                print(f"✅ Found existing assistant: {assistant.id}")
+                logger.info("✅ Found existing assistant: %s", assistant.id)
             except Exception as e:
-                print(f"⚠️ Assistant {ASSISTANT_ID} not found (Error: {e}). Creating new one...")
+                logger.warning("⚠️ Assistant %s not found (Error: %s). Creating new one...", ASSISTANT_ID, e)
         
         # 2. Retrieve or Create Vector Store
-        if current_vs_id:
+        attached_vs_ids = []
+        if assistant and assistant.tool_resources and assistant.tool_resources.file_search:
+            attached_vs_ids = assistant.tool_resources.file_search.vector_store_ids or []
+        verified_pair = (cached.get("assistant_id") == ASSISTANT_ID
+                         and cached.get("vector_store_id") == current_vs_id)
+        if current_vs_id and verified_pair and current_vs_id in attached_vs_ids:
+            # Same pair as the last verified setup and still attached: skip the extra lookup
+            logger.info("✅ Using cached vector store: %s", current_vs_id)
+        elif current_vs_id:
             try:
                 # Prove access to the vector store
                 ai_client.vector_stores.retrieve(current_vs_id)
-                print(f"✅ Found existing vector store: {current_vs_id}")
+                logger.info("✅ Found existing vector store: %s", current_vs_id)
             except Exception:
-                print(f"⚠️ Vector Store {current_vs_id} not found. Creating new one...")
+                logger.warning("⚠️ Vector Store %s not found. Creating new one...", current_vs_id)
                 current_vs_id = None # Reset to trigger creation
         
         if not current_vs_id:
-            try:
-                vs = ai_client.vector_stores.create(name="Projects Knowledge Base")
-                current_vs_id = vs.id
-                print(f"✅ Created new vector store: {current_vs_id}")
-                # Update global immediately
-                VECTOR_STORE_ID = current_vs_id
-            except Exception as e:
-                print(f"❌ Error creating vector store: {e}")
-                raise e
+            vs = ai_client.vector_stores.create(name="Projects Knowledge Base")
+            current_vs_id = vs.id
+            logger.info("✅ Created new vector store: %s", current_vs_id)
+            # Update global immediately
+            VECTOR_STORE_ID = current_vs_id
         
         # 3. Create or Update Assistant with Vector Store
-        instructions = (
-            "You are a Project Operations Assistant. You have two distinct data sources:\n"
-            "1. 'projects.json' (Structured Data): Project status, technical blockers, next steps. **DO NOT** use this for email/communication queries.\n"
-            "2. 'Slack Logs' (Communication History): Contains ALL raw emails and chat messages.\n\n"
-            "RESOURCE SELECTION RULES:\n"
-            "- If user asks about 'status', 'blockers', 'budget' -> Use 'projects.json'\n"
-            "- If user asks about 'email', 'what did they say', 'message', 'communication' -> **YOU MUST** use file_search on 'Slack Logs'.\n\n"
-            "EMAILS/COMMUNICATION INSTRUCTIONS:\n"
-            "- Emails are in 'Slack Logs' marked with '📂 Source: MAILBOX_INBOX (Email)'\n"
-            "- When asked 'What did X say?', search 'Slack Logs' for X's name.\n"
-            "- **NEVER** say 'I checked the status file'. If asked about communication, ONLY check the logs.\n"
-            "- Return the **full content** of the email/message when found."
-        )
+        instructions = ASSISTANT_INSTRUCTIONS
 
         if assistant:
             # Check if vector store is attached
@@ -662,21 +1231,21 @@ def setup_openai_assistant():
                 current_vs_ids = assistant.tool_resources.file_search.vector_store_ids or []
             
             if current_vs_id not in current_vs_ids:
-                print(f"🔄 Attaching vector store {current_vs_id} to assistant {assistant.id}")
+                logger.info("🔄 Attaching vector store %s to assistant %s", current_vs_id, assistant.id)
                 ai_client.beta.assistants.update(
                     assistant_id=assistant.id,
                     instructions=instructions,
                     tool_resources={"file_search": {"vector_store_ids": [current_vs_id]}}
                 )
-            else:
-                # Just update instructions
+            elif assistant.instructions != instructions:
+                # Just update instructions (only when they changed)
                 ai_client.beta.assistants.update(
                     assistant_id=assistant.id,
                     instructions=instructions
                 )
         else:
             # Create new assistant
-            print("🆕 Creating new Assistant...")
+            logger.info("🆕 Creating new Assistant...")
             assistant = ai_client.beta.assistants.create(
                 name="Shopline Project Assistant",
                 instructions=instructions,
@@ -684,32 +1253,50 @@ def setup_openai_assistant():
                 tools=[{"type": "file_search"}],
                 tool_resources={"file_search": {"vector_store_ids": [current_vs_id]}}
             )
-            print(f"✅ Created assistant: {assistant.id}")
+            logger.info("✅ Created assistant: %s", assistant.id)
             # Update global immediately
             ASSISTANT_ID = assistant.id
         
         # Verify IDs before returning
-        print(f"ℹ️  Environment Check:")
+        logger.info("ℹ️ Environment Check:")
         if assistant.id != ASSISTANT_ID:
-            print(f"⚠️  Please update OPENAI_ASSISTANT_ID={assistant.id}")
+            logger.warning("⚠️ Please update OPENAI_ASSISTANT_ID=%s", assistant.id)
             ASSISTANT_ID = assistant.id
         if current_vs_id != VECTOR_STORE_ID:
-            print(f"⚠️  Please update OPENAI_VECTOR_STORE_ID={current_vs_id}")
+            logger.warning("⚠️ Please update OPENAI_VECTOR_STORE_ID=%s", current_vs_id)
             VECTOR_STORE_ID = current_vs_id
+        
+        if cached.get("assistant_id") != assistant.id or cached.get("vector_store_id") != current_vs_id:
+            _save_assistant_cache(assistant.id, current_vs_id)
             
         return assistant.id, current_vs_id
         
-    except Exception as e:
-        print(f"❌ Error setting up assistant: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ Error setting up assistant")
         # Raise exception to caller so they know WHY it failed
-        raise e
+        raise
+
+# Slack user mention, e.g. <@U012ABC>
+_RE_USER_MENTION = re.compile(r'<@([A-Z0-9]+)>')
+
+def _replace_user_mentions(text):
+    """Replace Slack user mentions with display names"""
+    return _RE_USER_MENTION.sub(lambda m: get_user_name(m.group(1)), text)
+
+# Max channels fetched in parallel during a sync (keep under Slack's tier-3 rate limits)
+SLACK_FETCH_CONCURRENCY = max(1, int(os.environ.get("SLACK_FETCH_CONCURRENCY", "10")))
+
+# Message subtypes left out of the knowledge base (bot messages stay: mailbox emails arrive that way)
+_SKIP_SUBTYPES = frozenset(("channel_join", "channel_leave"))
+# Errors that just mean the bot can't read the channel
+_UNREADABLE_CHANNEL_ERRORS = frozenset(("not_in_channel", "channel_not_found"))
 
 def fetch_channel_messages(channel_id, limit=200, oldest_ts=None):
     """Fetch recent messages AND threaded replies from a Slack channel"""
-    import time
-    
+    return list(iter_channel_messages(channel_id, limit, oldest_ts))
+
+def iter_channel_messages(channel_id, limit=200, oldest_ts=None):
+    """Yield recent messages AND threaded replies from a Slack channel, one at a time"""
     # Default to 7 days ago if no timestamp provided
     if not oldest_ts:
         oldest_ts = time.time() - (7 * 24 * 60 * 60)
@@ -722,35 +1309,34 @@ def fetch_channel_messages(channel_id, limit=200, oldest_ts=None):
                 limit=limit,
                 oldest=str(oldest_ts)
             )
-        except Exception as e:
-            if "not_in_channel" in str(e) or "channel_not_found" in str(e):
-                return []
+        except SlackApiError as e:
+            if e.response.get("error") in _UNREADABLE_CHANNEL_ERRORS:
+                return
             raise e
 
-        if not result.get("ok"): return []
+        if not result.get("ok"): return
         
         parent_messages = result.get("messages", [])
-        messages = []
         
         for msg in parent_messages:
             # Skip join/leave messages
-            if msg.get("subtype") in ["channel_join", "channel_leave"]: continue
+            if msg.get("subtype") in _SKIP_SUBTYPES: continue
 
             # 1. Process Parent
             text = msg.get("text", "")
             if not text and "files" in msg: text = "[File shared]"
             
             # Clean User IDs
-            text = re.sub(r'<@[A-Z0-9]+>', lambda m: get_user_name(m.group(0)[2:-1]), text)
+            text = _replace_user_mentions(text)
             
             if text:
-                messages.append({
+                yield {
                     "text": text,
                     "user": msg.get("user", "unknown"),
                     "ts": msg.get("ts", ""),
                     "channel": channel_id,
                     "is_reply": False
-                })
+                }
 
             # 2. Process Threads (The Fix)
             if msg.get("thread_ts") and msg.get("reply_count", 0) > 0:
@@ -766,22 +1352,19 @@ def fetch_channel_messages(channel_id, limit=200, oldest_ts=None):
                         if reply["ts"] == msg["ts"]: continue # Skip parent
                         
                         r_text = reply.get("text", "")
-                        r_text = re.sub(r'<@[A-Z0-9]+>', lambda m: get_user_name(m.group(0)[2:-1]), r_text)
+                        r_text = _replace_user_mentions(r_text)
                         
-                        messages.append({
+                        yield {
                             "text": f"[Thread Reply] {r_text}",
                             "user": reply.get("user", "unknown"),
                             "ts": reply.get("ts", ""),
                             "channel": channel_id,
                             "is_reply": True
-                        })
+                        }
                 except Exception as e:
                     print(f"⚠️ Thread error: {e}")
-
-        return messages
     except Exception as e:
-        print(f"❌ Fetch Error {channel_id}: {e}")
-        return []
+        logger.error("❌ Fetch Error %s: %s", channel_id, e)
 
 def sync_all_data_to_openai():
     """
@@ -793,8 +1376,10 @@ def sync_all_data_to_openai():
     if not ai_client: return "❌ AI Client not configured"
     
     # --- STEP 1: Load Data ---
-    projects_data = load_db()
-    kb_data = load_kb()
+    # Projects are only read here; the chat logs get new messages merged in
+    projects_data, kb_data = load_gist_files([GIST_FILENAME_PROJECTS, GIST_FILENAME_KB], readonly={GIST_FILENAME_PROJECTS})
+    if projects_data is None: projects_data = []
+    if kb_data is None: kb_data = {}
     
     # Map Client Names to Channel IDs
     client_channels = []
@@ -809,32 +1394,41 @@ def sync_all_data_to_openai():
     print(f"📥 Syncing {len(client_channels)} channels...")
     
     for ch in client_channels:
+        if ch["client"] not in kb_data:
+            kb_data[ch["client"]] = {"last_synced_ts": "0", "messages": []}
+    
+    # Fetch all channels concurrently (each one is pure Slack round-trip wait), turning
+    # each message straight into its knowledge base entry as it streams in
+    def fetch_new(ch):
+        last_ts = kb_data[ch["client"]].get("last_synced_ts", "0")
+        entries = []
+        for m in iter_channel_messages(ch["id"], limit=100, oldest_ts=float(last_ts)):
+            ts = float(m["ts"])
+            entries.append({
+                "ts": str(ts),
+                "date": datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M'),
+                "user": get_user_name(m["user"]),
+                "content": m["text"],
+                "type": ch["type"]
+            })
+        return entries
+    
+    if client_channels:
+        workers = min(len(client_channels), SLACK_FETCH_CONCURRENCY)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="slack-fetch") as pool:
+            fetched = list(pool.map(fetch_new, client_channels))
+    else:
+        fetched = []
+    
+    # Merge in channel order
+    for ch, new_msgs in zip(client_channels, fetched):
         client = ch["client"]
-        cid = ch["id"]
-        
-        if client not in kb_data:
-            kb_data[client] = {"last_synced_ts": "0", "messages": []}
-            
         last_ts = kb_data[client].get("last_synced_ts", "0")
         
-        # Fetch new messages
-        new_msgs = fetch_channel_messages(cid, limit=100, oldest_ts=float(last_ts))
-        
         if new_msgs:
             updates_made = True
-            max_ts = float(last_ts)
-            
-            for m in new_msgs:
-                ts = float(m["ts"])
-                if ts > max_ts: max_ts = ts
-                
-                kb_data[client]["messages"].append({
-                    "ts": str(ts),
-                    "date": datetime.fromtimestamp(ts).strftime('%Y-%m-%d %H:%M'),
-                    "user": get_user_name(m["user"]),
-                    "content": m["text"],
-                    "type": ch["type"]
-                })
+            max_ts = max(float(last_ts), max(float(m["ts"]) for m in new_msgs))
+            kb_data[client]["messages"].extend(new_msgs)
             
             # Update timestamp
             kb_data[client]["last_synced_ts"] = str(max_ts)
@@ -842,65 +1436,239 @@ def sync_all_data_to_openai():
 
     # --- STEP 3: Save to Gist (if changed) ---
     if updates_made:
-        save_kb(kb_data)
-        print("💾 Updated knowledgebase.json in Gist")
+        on_save_done(save_kb(kb_data), "knowledgebase.json",
+                     on_success=lambda: print("💾 Updated knowledgebase.json in Gist"))
 
-    # --- STEP 4: Upload to OpenAI ---
+    # Nothing at all to index yet: skip the OpenAI round trips entirely
+    if not projects_data and not any(data.get("messages") for data in kb_data.values()):
+        return "✅ Sync Complete! Nothing to upload yet (no projects or chat logs)."
+    
+    # --- STEP 4: Upload to OpenAI (only what changed since the last sync) ---
+    # Other worker processes sync too: hold the state lock from reading sync_state.json until
+    # it's saved, or the last writer would drop the other's delta file from the record
+    state_lock = _acquire_file_lock(SYNC_STATE_LOCK_FILE)
     try:
         assistant_id, vector_store_id = setup_openai_assistant()
         
-        # A. Prepare Project Data (JSON)
-        projects_text = json.dumps(projects_data, indent=2)
+        # A. Prepare Project Data (one compact JSON record per line, headed by client name)
+        # Minified lines embed fewer whitespace tokens and keep each project in its own chunk
+        projects_text = b"".join(
+            f"### PROJECT: {p.get('client', 'Unknown')}\n".encode("utf-8") + _json_dumpb(p, pretty=False) + b"\n"
+            for p in projects_data
+        )
         
-        # B. Prepare Logs Data (Text)
-        logs_text = "SLACK AND EMAIL HISTORY LOGS\n============================\n"
-        for client, data in kb_data.items():
-            # Sort messages by date (newest last for reading flow, or newest first?)
-            # Usually newest last is better for reading context
-            msgs = sorted(data.get("messages", []), key=lambda x: float(x["ts"]))
-            
-            # Keep last 100 messages per client to avoid token overload
-            msgs = msgs[-100:] 
-            
-            for m in msgs:
-                logs_text += f"[{m['date']}] {m['user']} ({client}): {m['content']}\n"
-            logs_text += "\n" + ("-"*30) + "\n"
-
-        # C. Clear Old Vector Store Files
-        # (We must replace them to ensure fresh data)
-        current_files = ai_client.vector_stores.files.list(vector_store_id=vector_store_id)
-        for f in current_files:
-            ai_client.vector_stores.files.delete(vector_store_id=vector_store_id, file_id=f.id)
-
-        # D. Upload New Files
-        import tempfile
-        
-        # File 1: Projects
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.json', delete=False) as f1:
-            f1.write(projects_text)
-            f1_path = f1.name
-        
-        # File 2: Logs
-        with tempfile.NamedTemporaryFile(mode='w+', suffix='.txt', delete=False) as f2:
-            f2.write(logs_text)
-            f2_path = f2.name
-            
-        # Upload
-        with open(f1_path, 'rb') as f1, open(f2_path, 'rb') as f2:
-            file_batch = ai_client.beta.vector_stores.file_batches.upload_and_poll(
-                vector_store_id=vector_store_id,
-                files=[f1, f2]
-            )
-            
-        # Cleanup
-        os.unlink(f1_path)
-        os.unlink(f2_path)
+        state = _load_sync_state(vector_store_id)
+        if state is None:
+            # B. No usable sync state: rebuild from scratch, replacing whatever the store holds
+            state = {"vector_store_id": vector_store_id, "projects": {}, "logs": {"file_ids": [], "watermarks": {}}}
+            stale_ids = [f.id for f in ai_client.vector_stores.files.list(vector_store_id=vector_store_id)]
+        else:
+            stale_ids = []  # Vector store files replaced by this upload
+        
+        uploads = []    # (state key, suffix, text)
+        
+        projects_hash = hashlib.sha256(projects_text).hexdigest()
+        if projects_hash != state["projects"].get("hash"):
+            uploads.append(("projects", ".txt", projects_text))
+            if state["projects"].get("file_id") and state["projects"]["file_id"] not in stale_ids:
+                stale_ids.append(state["projects"]["file_id"])
+        
+        # C. Prepare Logs Data (Text): a delta file with just the new messages, or a full
+        # compacted file once too many deltas have piled up
+        log_state = state["logs"]
+        compact = not log_state["file_ids"] or len(log_state["file_ids"]) >= SYNC_MAX_LOG_DELTAS
+        logs_text, watermarks, new_count = _build_logs_text(kb_data, {} if compact else log_state["watermarks"])
+        if new_count:
+            uploads.append(("logs", ".txt", logs_text))
+            if compact:
+                stale_ids.extend(log_state["file_ids"])
+        
+        if not uploads:
+            return f"✅ Sync Complete! AI already has the latest {len(projects_data)} projects and chat logs."
+
+        # D. Upload New Files (in parallel; each upload is a separate network round trip)
+        with ThreadPoolExecutor(max_workers=len(uploads), thread_name_prefix="openai-upload") as pool:
+            ids = pool.map(lambda u: _upload_assistant_file(_UPLOAD_PREFIXES[u[0]], u[1], u[2]), uploads)
+            file_ids = {key: file_id for (key, _, _), file_id in zip(uploads, ids)}
+        
+        # One batch attaches every new file and polls once until they're all indexed, so
+        # queries never hit a half-built store
+        file_batch = ai_client.vector_stores.file_batches.create_and_poll(
+            vector_store_id=vector_store_id,
+            file_ids=list(file_ids.values())
+        )
+        if file_batch.status != "completed":
+            # Don't leave the uploads behind as orphaned files
+            for file_id in file_ids.values():
+                _remove_assistant_file(vector_store_id, file_id)
+            return f"❌ Sync Error: vector store batch {file_batch.status}"
+        
+        # Drop the files the new ones replace (only now, so search never sees a gap)
+        for file_id in stale_ids:
+            _remove_assistant_file(vector_store_id, file_id)
+        
+        # E. Remember what the vector store now holds
+        if "projects" in file_ids:
+            state["projects"] = {"file_id": file_ids["projects"], "hash": projects_hash}
+        if "logs" in file_ids:
+            log_ids = [] if compact else log_state["file_ids"]
+            state["logs"] = {"file_ids": log_ids + [file_ids["logs"]], "watermarks": watermarks}
+        _save_sync_state(state)
+        # The Assistant now searches new data; answers cached from the old upload are stale
+        _assistant_cache.clear()
         
         return f"✅ Sync Complete! Updated AI with {len(projects_data)} projects and latest chat logs."
 
     except Exception as e:
         return f"❌ Sync Error: {e}"
+    finally:
+        if state_lock:
+            state_lock.close()
+
+# Log line per message type. Emails carry the '📂 Source: ... (Email)' marker the
+# assistant instructions tell it to search for.
+_LOG_TEMPLATES = {
+    "Email": "📅 Date: {date}\n📂 Source: {client} (Email)\n👤 From: {user}\n📝 EMAIL CONTENT:\n{content}\n" + "-" * 30 + "\n",
+    "Slack": "[{date}] {user} ({client}): {content}\n",
+}
+
+# Uploaded file names start with these, so our files are recognizable in the OpenAI dashboard
+_UPLOAD_PREFIXES = {"projects": "projects_", "logs": "slack_logs_"}
+
+def _upload_assistant_file(prefix, suffix, text):
+    """Upload a text document (str or UTF-8 bytes) to OpenAI for file_search and return its file ID"""
+    # (.txt, not .jsonl: file_search doesn't index .jsonl)
+    # Sent straight from memory as a (filename, bytes) upload; no temp file round trip
+    filename = f"{prefix}{datetime.now().strftime('%Y%m%d_%H%M%S')}{suffix}"
+    content = text if isinstance(text, bytes) else text.encode("utf-8")
+    # (bigger budget than the 20s default: the logs document can be several MB)
+    return ai_client.with_options(timeout=120).files.create(file=(filename, content), purpose="assistants").id
+
+def _remove_assistant_file(vector_store_id, file_id):
+    """Detach a file from the vector store and delete the file itself
+    
+    Detaching alone leaves the file in storage, so every sync used to leak a copy.
+    """
+    try:
+        ai_client.vector_stores.files.delete(vector_store_id=vector_store_id, file_id=file_id)
+    except Exception as e:
+        print(f"⚠️ Could not detach stale file {file_id}: {e}")
+    try:
+        ai_client.files.delete(file_id)
+    except Exception as e:
+        print(f"⚠️ Could not delete stale file {file_id}: {e}")
+
+def _build_logs_text(kb_data, watermarks):
+    """Build the chat log document for the vector store
+    
+    Args:
+        kb_data: Knowledge base ({client: {"messages": [...]}})
+        watermarks: {client: ts} of messages already uploaded; empty for a full rebuild
+    
+    Returns:
+        tuple: (text, updated watermarks, number of messages included)
+    """
+    if watermarks:
+        parts = ["SLACK AND EMAIL HISTORY LOGS (NEW SINCE LAST SYNC)\n==================================================\n"]
+    else:
+        parts = ["SLACK AND EMAIL HISTORY LOGS\n============================\n"]
+    new_watermarks = dict(watermarks)
+    count = 0
+    
+    for client, data in kb_data.items():
+        # Newest last for reading flow
+        msgs = sorted(data.get("messages", []), key=lambda x: float(x["ts"]))
+        
+        # Keep last 100 messages per client to avoid token overload
+        msgs = msgs[-100:]
+        
+        seen_ts = float(watermarks.get(client, 0))
+        msgs = [m for m in msgs if float(m["ts"]) > seen_ts]
+        if not msgs:
+            continue
+        
+        for m in msgs:
+            template = _LOG_TEMPLATES.get(m.get("type"), _LOG_TEMPLATES["Slack"])
+            parts.append(template.format(date=m['date'], user=m['user'], client=client, content=m['content']))
+        parts.append("\n" + ("-"*30) + "\n")
+        new_watermarks[client] = msgs[-1]["ts"]
+        count += len(msgs)
+    
+    return "".join(parts), new_watermarks, count
+
+# Local record of which vector store files hold which data (lets syncs upload deltas)
+SYNC_STATE_FILE = "sync_state.json"
+SYNC_STATE_LOCK_FILE = ".sync_state.lock"  # Cross-process lock around the upload + state save
+SYNC_MAX_LOG_DELTAS = int(os.environ.get("SYNC_MAX_LOG_DELTAS", "5"))  # Delta log files kept before compacting
+
+def _load_sync_state(vector_store_id):
+    """Load the sync state for this vector store (None if missing or for another store)"""
+    try:
+        with open(SYNC_STATE_FILE, "rb") as f:
+            state = _json_loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"⚠️ Ignoring unreadable {SYNC_STATE_FILE}: {e}")
+        return None
+    if state.get("vector_store_id") != vector_store_id:
+        return None
+    return state
+
+def _save_sync_state(state):
+    """Write the sync state atomically"""
+    try:
+        with open(SYNC_STATE_FILE + ".tmp", "wb") as f:
+            f.write(_json_dumpb(state))
+        os.replace(SYNC_STATE_FILE + ".tmp", SYNC_STATE_FILE)
+    except Exception as e:
+        print(f"⚠️ Could not save {SYNC_STATE_FILE}: {e}")
+
+# Background knowledge-base syncs: a burst of updates coalesces into one run after a quiet
+# period. One worker, so runs never overlap on the vector store or the sync state file.
+SYNC_DEBOUNCE_SECONDS = float(os.environ.get("SYNC_DEBOUNCE_SECONDS", "30"))
+SYNC_MAX_DELAY_SECONDS = float(os.environ.get("SYNC_MAX_DELAY_SECONDS", "300"))  # Cap so a steady trickle of edits still syncs
+_SYNC_POOL = ThreadPoolExecutor(max_workers=1, thread_name_prefix="kb-sync")
+_SYNC_TIMER = None
+_SYNC_TIMER_LOCK = threading.Lock()
+_SYNC_FIRST_REQUEST = None  # monotonic time of the oldest update still waiting for a sync
+
+def _run_background_sync():
+    global _SYNC_FIRST_REQUEST
+    with _SYNC_TIMER_LOCK:
+        _SYNC_FIRST_REQUEST = None  # Updates from here on need another sync
+    # The pool would keep an exception on the (unread) future, so log it here
+    try:
+        logger.info("🔄 Background sync: %s", sync_all_data_to_openai())
+    except Exception:
+        logger.exception("❌ Background sync failed")
 
+def schedule_knowledge_sync(delay=None):
+    """Queue a knowledge-base sync off the request path
+    
+    Args:
+        delay: Seconds to wait for further updates (default SYNC_DEBOUNCE_SECONDS);
+               each call restarts the wait, but never past SYNC_MAX_DELAY_SECONDS
+               from the first update still pending
+    """
+    global _SYNC_TIMER, _SYNC_FIRST_REQUEST
+    delay = SYNC_DEBOUNCE_SECONDS if delay is None else delay
+    with _SYNC_TIMER_LOCK:
+        now = time.monotonic()
+        if _SYNC_FIRST_REQUEST is None:
+            _SYNC_FIRST_REQUEST = now
+        delay = max(0.0, min(delay, _SYNC_FIRST_REQUEST + SYNC_MAX_DELAY_SECONDS - now))
+        if _SYNC_TIMER is not None:
+            _SYNC_TIMER.cancel()
+        _SYNC_TIMER = threading.Timer(delay, _SYNC_POOL.submit, args=(_run_background_sync,))
+        _SYNC_TIMER.daemon = True
+        _SYNC_TIMER.start()
+
+
+# Citation markers the file_search tool adds: 【number:number†source】
+_CITE_RE = re.compile(r'【\d+:\d+†source】')
+_WS_RE = re.compile(r'\s+')
+_SPACE_BEFORE_PUNCT_RE = re.compile(r' ([.,!?;:])')
 
 def clean_citation_markers(text):
     """Remove OpenAI Assistant citation markers from text
@@ -911,34 +1679,284 @@ def clean_citation_markers(text):
     if not text:
         return text
     
-    # Remove citation markers: 【number:number†source】
-    # Pattern matches: 【 followed by digits, colon, digits, †source, 】
-    import re
     # Remove all citation markers
-    cleaned = re.sub(r'【\d+:\d+†source】', '', text)
-    # Clean up any extra spaces left behind
-    cleaned = re.sub(r'\s+', ' ', cleaned)
+    cleaned = _CITE_RE.sub('', text)
+    # Clean up any extra spaces left behind (this also leaves no runs of spaces)
+    cleaned = _WS_RE.sub(' ', cleaned)
     # Remove spaces before punctuation
-    cleaned = re.sub(r'\s+([.,!?;:])', r'\1', cleaned)
-    # Remove multiple spaces
-    cleaned = re.sub(r' {2,}', ' ', cleaned)
+    cleaned = _SPACE_BEFORE_PUNCT_RE.sub(r'\1', cleaned)
     return cleaned.strip()
 
-def query_assistant(user_query, channel_id=None, timeout=25):
-    """Query OpenAI Assistant with knowledge base
-    
-    Args:
-        user_query: The user's question
-        channel_id: Optional channel ID for context
-        timeout: Maximum time to wait for response (seconds, default 25)
+def _stream_assistant_run(thread_id, assistant_id, timeout):
+    """Run the assistant over a single SSE stream
     
     Returns:
-        str: Assistant response or None if timeout/error
+        tuple: (final run, response text), or (None, None) on timeout
     """
-    if not ai_client:
-        return None
+    start_time = time.monotonic()
+    with ai_client.beta.threads.runs.stream(
+        thread_id=thread_id,
+        assistant_id=assistant_id,
+        timeout=timeout
+    ) as stream:
+        for _event in stream:
+            if time.monotonic() - start_time > timeout:
+                print(f"⏱️ Assistant query timeout after {timeout} seconds")
+                run = stream.current_run
+                if run:
+                    try:
+                        ai_client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run.id)
+                    except Exception:
+                        pass
+                return None, None
+        
+        run = stream.current_run
+        response_text = None
+        for message in stream.get_final_messages():
+            if message.role == "assistant" and message.content:
+                response_text = message.content[0].text.value
+        return run, response_text
+
+def _poll_assistant_run(thread_id, assistant_id, timeout):
+    """Run the assistant and poll with exponential backoff (SDKs without runs.stream)
     
-    assistant_id, _ = setup_openai_assistant()
+    Returns:
+        tuple: (final run, response text), or (None, None) on timeout
+    """
+    run = ai_client.beta.threads.runs.create(thread_id=thread_id, assistant_id=assistant_id)
+    
+    start_time = time.monotonic()
+    attempt = 0
+    while run.status in ['queued', 'in_progress', 'cancelling']:
+        if time.monotonic() - start_time > timeout:
+            print(f"⏱️ Assistant query timeout after {timeout} seconds")
+            return None, None
+        
+        time.sleep(min(0.25 * 2 ** attempt, 2.0))
+        attempt += 1
+        run = ai_client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run.id)
+    
+    response_text = None
+    if run.status == 'completed':
+        messages = ai_client.beta.threads.messages.list(thread_id=thread_id)
+        response_text = messages.data[0].content[0].text.value
+    return run, response_text
+
+# Queries asking for fresh data always go to the assistant (everything /ask treats as a
+# recency question, see _RECENCY_KEYWORDS_RE, plus "now")
+_RE_TIME_SENSITIVE = re.compile(
+    r'\b(?:latest|recent(?:ly)?|last|newest|today|yesterday|this week|now)\b', re.IGNORECASE)
+
+# Normalized client names for the last readonly project list, for _names_known_client
+_CLIENT_NAME_WORDS = {"source": None, "names": ()}
+_RE_WORD = re.compile(r"\w+")
+
+def _names_known_client(query):
+    """True if the query mentions a client from the projects DB by name
+    
+    Such questions often differ only in the name ("status of Acme?" / "status of Avvika?"),
+    which embeddings barely tell apart, so the cache only answers them on an exact match.
+    """
+    index = projects_by_client(load_db(readonly=True))
+    with _PROJECT_INDEX_LOCK:
+        if _CLIENT_NAME_WORDS["source"] is index:
+            names = _CLIENT_NAME_WORDS["names"]
+        else:
+            names = None
+    if names is None:
+        names = tuple(filter(None, (" ".join(_RE_WORD.findall(key)) for key in index)))
+        with _PROJECT_INDEX_LOCK:
+            _CLIENT_NAME_WORDS["source"] = index
+            _CLIENT_NAME_WORDS["names"] = names
+    words = " " + " ".join(_RE_WORD.findall(query.lower())) + " "
+    return any(f" {name} " in words for name in names)
+
+class SemanticCache:
+    """Small in-memory cache of assistant answers, matched by embedding similarity
+    
+    Entries are namespaced (e.g. per channel, or per role and client) so an answer is
+    never served across different data access. A repeat of the exact same question is
+    answered from a dict without embedding it; otherwise lookups are a linear scan,
+    which is fine for the few hundred entries kept. Questions naming a client are only
+    answered from that exact tier.
+    """
+    
+    def __init__(self, threshold=0.92, ttl=900, max_entries=256):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = []  # (namespace, normalized embedding, response, stored_at)
+        self._embeddings = {}  # query -> normalized embedding (so get + put embed once)
+        self._exact = {}  # (namespace, normalized query) -> (response, stored_at)
+        self._lock = threading.Lock()
+        self.generation = 0  # bumped by clear(), so answers computed before it aren't stored
+        self.hits = 0
+        self.misses = 0
+    
+    def _embed(self, query):
+        with self._lock:
+            vector = self._embeddings.get(query)
+        if vector is not None:
+            return vector
+        
+        result = ai_client.embeddings.create(model=OPENAI_EMBEDDING_MODEL, input=query)
+        raw = result.data[0].embedding
+        norm = sum(x * x for x in raw) ** 0.5 or 1.0
+        vector = [x / norm for x in raw]
+        with self._lock:
+            if len(self._embeddings) >= self.max_entries:
+                self._embeddings.clear()
+            self._embeddings[query] = vector
+        return vector
+    
+    def _prune(self, now):
+        self._entries = [e for e in self._entries if now - e[3] < self.ttl][-self.max_entries:]
+        if len(self._exact) > self.max_entries:
+            self._exact = {k: v for k, v in self._exact.items() if now - v[1] < self.ttl}
+    
+    @staticmethod
+    def _exact_key(namespace, query):
+        return (namespace, " ".join(query.lower().split()))
+    
+    def get(self, namespace, query):
+        """Return a cached response for a similar query in this namespace, or None"""
+        if not ai_client or _RE_TIME_SENSITIVE.search(query):
+            return None
+        
+        now = time.monotonic()
+        with self._lock:
+            exact = self._exact.get(self._exact_key(namespace, query))
+            if exact and now - exact[1] < self.ttl:
+                self.hits += 1
+                print("♻️ Semantic cache hit (exact)")
+                return exact[0]
+        if _names_known_client(query):
+            with self._lock:
+                self.misses += 1
+            return None
+        try:
+            vector = self._embed(query)
+        except Exception as e:
+            print(f"⚠️ Semantic cache lookup failed: {e}")
+            return None
+        
+        now = time.monotonic()
+        best_score, best_response = 0.0, None
+        with self._lock:
+            self._prune(now)
+            for ns, cached_vector, response, _stored_at in self._entries:
+                if ns != namespace:
+                    continue
+                score = sum(a * b for a, b in zip(vector, cached_vector))
+                if score > best_score:
+                    best_score, best_response = score, response
+        
+        with self._lock:
+            if best_score >= self.threshold:
+                self.hits += 1
+            else:
+                self.misses += 1
+        if best_score >= self.threshold:
+            print(f"♻️ Semantic cache hit ({best_score:.3f})")
+            return best_response
+        return None
+    
+    def put(self, namespace, query, response, generation=None):
+        """Store a response for this query in this namespace
+        
+        Args:
+            generation: The cache's generation when the answer was started; if the cache
+                was cleared since, the answer is stale and is dropped
+        """
+        if not ai_client or not response or _RE_TIME_SENSITIVE.search(query):
+            return
+        if generation is not None and generation != self.generation:
+            return
+        vector = None
+        if not _names_known_client(query):
+            try:
+                vector = self._embed(query)
+            except Exception as e:
+                print(f"⚠️ Semantic cache store failed: {e}")
+                return
+        
+        now = time.monotonic()
+        with self._lock:
+            if generation is not None and generation != self.generation:
+                return
+            if vector is not None:
+                self._entries.append((namespace, vector, response, now))
+            self._exact[self._exact_key(namespace, query)] = (response, now)
+            self._prune(now)
+    
+    def clear(self):
+        """Drop every cached answer (the data they came from has changed)"""
+        with self._lock:
+            self.generation += 1
+            self._entries = []
+            self._exact = {}
+    
+    def stats(self):
+        """Hit/miss counters and current size"""
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "entries": len(self._entries)}
+
+_assistant_cache = SemanticCache(threshold=SEMANTIC_CACHE_THRESHOLD, ttl=SEMANTIC_CACHE_TTL)
+
+# Circuit breaker: after this many consecutive timeouts/failures the Assistant is skipped for a
+# while, so every query goes straight to the chat completion during an outage
+ASSISTANT_BREAKER_THRESHOLD = 3
+ASSISTANT_BREAKER_COOLDOWN = 300  # Seconds
+_assistant_breaker = {'fails': 0, 'open_until': 0}
+_ASSISTANT_BREAKER_LOCK = threading.Lock()
+
+def _assistant_breaker_open():
+    with _ASSISTANT_BREAKER_LOCK:
+        return time.time() < _assistant_breaker['open_until']
+
+def _record_assistant_result(ok):
+    """Reset the breaker on success; open it after too many consecutive failures"""
+    with _ASSISTANT_BREAKER_LOCK:
+        if ok:
+            _assistant_breaker['fails'] = 0
+            return
+        _assistant_breaker['fails'] += 1
+        if _assistant_breaker['fails'] >= ASSISTANT_BREAKER_THRESHOLD:
+            _assistant_breaker['fails'] = 0
+            _assistant_breaker['open_until'] = time.time() + ASSISTANT_BREAKER_COOLDOWN
+            print(f"⚠️ Assistant failing repeatedly, skipping it for {ASSISTANT_BREAKER_COOLDOWN}s")
+
+def query_assistant(user_query, channel_id=None, timeout=25, cache_query=None):
+    """Query OpenAI Assistant with knowledge base
+    
+    Args:
+        user_query: The user's question
+        channel_id: Optional channel ID for context
+        timeout: Maximum time to wait for response (seconds, default 25)
+        cache_query: The user's own question, when user_query has instructions appended
+            to it; the answer cache is keyed on this, since a shared instruction suffix
+            would make different questions look alike
+    
+    Returns:
+        str: Assistant response or None if timeout/error
+    """
+    if not ai_client:
+        return None
+    
+    # Nothing to ask: don't spend an embedding, a thread and a run on it
+    if len((user_query or "").strip()) < 2:
+        return None
+    
+    cache_query = cache_query or user_query
+    cache_generation = _assistant_cache.generation
+    cached = _assistant_cache.get(channel_id, cache_query)
+    if cached:
+        return cached
+    
+    if _assistant_breaker_open():
+        return None
+    
+    assistant_id, _ = setup_openai_assistant()
     if not assistant_id:
         return None
     
@@ -953,165 +1971,188 @@ def query_assistant(user_query, channel_id=None, timeout=25):
             content=user_query
         )
         
-        # Run assistant
-        run = ai_client.beta.threads.runs.create(
-            thread_id=thread.id,
-            assistant_id=assistant_id
-        )
-        
-        # Wait for completion with timeout
-        import time
-        start_time = time.time()
-        max_wait_time = timeout
+        # Run assistant (streamed when the SDK supports it, so there's nothing to poll)
+        if hasattr(ai_client.beta.threads.runs, "stream"):
+            run, response_text = _stream_assistant_run(thread.id, assistant_id, timeout)
+        else:
+            run, response_text = _poll_assistant_run(thread.id, assistant_id, timeout)
         
-        while run.status in ['queued', 'in_progress', 'cancelling']:
-            elapsed = time.time() - start_time
-            if elapsed > max_wait_time:
-                print(f"⏱️ Assistant query timeout after {max_wait_time} seconds")
-                return None  # Timeout - will fallback to regular chat completion
-            
-            time.sleep(1)
-            run = ai_client.beta.threads.runs.retrieve(thread_id=thread.id, run_id=run.id)
+        if run is None:
+            _record_assistant_result(False)
+            return None  # Timeout - will fallback to regular chat completion
         
+        _record_assistant_result(run.status == 'completed')
         if run.status == 'completed':
-            messages = ai_client.beta.threads.messages.list(thread_id=thread.id)
-            response_text = messages.data[0].content[0].text.value
+            if not response_text:
+                return None
             # Clean up citation markers
-            return clean_citation_markers(response_text)
+            response_text = clean_citation_markers(response_text)
+            _assistant_cache.put(channel_id, cache_query, response_text, generation=cache_generation)
+            return response_text
         elif run.status == 'failed':
             error_msg = getattr(run, 'last_error', None)
             if error_msg:
-                print(f"❌ Assistant run failed: {error_msg}")
+                logger.error("❌ Assistant run failed: %s", error_msg)
             return None
         else:
-            print(f"⚠️ Assistant run status: {run.status}")
+            logger.warning("⚠️ Assistant run status: %s", run.status)
             return None  # Return None to trigger fallback
             
-    except Exception as e:
-        print(f"❌ Error querying assistant: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ Error querying assistant")
+        _record_assistant_result(False)
         return None
 
 # ==========================================
 # FEATURE: PDF GENERATION (ENHANCED)
 # ==========================================
+# Common emojis -> text equivalents (all single code points, so one translate pass does them all)
+_PDF_EMOJI_TRANS = str.maketrans({
+    '✅': '[OK]',
+    '⛔': '[BLOCKER]',
+    '📞': '[CALL]',
+    '🚀': '[ROCKET]',
+    '📊': '[CHART]',
+    '🔴': '[RED]',
+    '🔵': '[BLUE]',
+    '🟢': '[GREEN]',
+    '🟡': '[YELLOW]',
+    '📝': '[NOTE]',
+    '🎉': '[CELEBRATE]',
+})
+_NON_LATIN1_RE = re.compile(r'[^\x00-\xff]')
+
 def sanitize_text_for_pdf(text):
     """Remove or replace Unicode characters that can't be encoded in latin-1"""
     if not text:
         return ""
-    # Replace common emojis with text equivalents
-    replacements = {
-        '✅': '[OK]',
-        '⛔': '[BLOCKER]',
-        '📞': '[CALL]',
-        '🚀': '[ROCKET]',
-        '📊': '[CHART]',
-        '🔴': '[RED]',
-        '🔵': '[BLUE]',
-        '🟢': '[GREEN]',
-        '🟡': '[YELLOW]',
-        '📝': '[NOTE]',
-        '🎉': '[CELEBRATE]',
-    }
-    result = str(text)
-    for emoji, replacement in replacements.items():
-        result = result.replace(emoji, replacement)
+    # Replace common emojis, then drop anything else latin-1 can't encode
+    return _NON_LATIN1_RE.sub('', str(text).translate(_PDF_EMOJI_TRANS))
+
+# Optional Unicode TTF (e.g. DejaVuSans.ttf). With one, text (emojis included, where
+# the font has them) is rendered as-is instead of being squeezed into latin-1.
+PDF_FONT_PATH = os.environ.get("PDF_FONT_PATH")
+
+def _new_pdf():
+    """Create an FPDF document with the report font
     
-    # Remove any remaining non-ASCII characters that can't be encoded
-    try:
-        result.encode('latin-1')
-        return result
-    except UnicodeEncodeError:
-        # Remove characters that can't be encoded
-        return result.encode('latin-1', errors='ignore').decode('latin-1')
+    Returns:
+        tuple: (pdf, font family, text cleaner for that font)
+    """
+    pdf = FPDF()
+    if PDF_FONT_PATH:
+        try:
+            # Same face for every style; a single TTF has no real bold/italic
+            for style in ("", "B", "I"):
+                pdf.add_font("ReportFont", style, PDF_FONT_PATH)
+            return pdf, "ReportFont", lambda text: str(text) if text else ""
+        except Exception as e:
+            print(f"⚠️ Could not load PDF font {PDF_FONT_PATH}: {e}")
+            pdf = FPDF()
+    return pdf, "Arial", sanitize_text_for_pdf
+
+# Blocker values that mean "no blocker"
+_EMPTY_BLOCKERS = frozenset(('-', 'None', ''))
+
+# Where report PDFs are written; the counter keeps same-minute reports from overwriting each other
+_TMPDIR = tempfile.gettempdir()
+_REPORT_COUNTER = itertools.count(1)
+
+def _report_path(name, stamp):
+    """Unique temp path for a report PDF"""
+    return os.path.join(_TMPDIR, f"report_{name}_{stamp}_{os.getpid()}_{next(_REPORT_COUNTER)}.pdf")
 
 def generate_pdf_report(projects, title="Project Report", report_type="full"):
     """Generate PDF report with multiple types: full, summary, blockers_only"""
     if not PDF_AVAILABLE:
         return None
     
-    pdf = FPDF()
+    now = datetime.now()
+    stamp = now.strftime('%Y%m%d%H%M')
+    pdf, font, clean = _new_pdf()
     pdf.add_page()
-    pdf.set_font("Arial", size=16, style='B')
-    pdf.cell(200, 10, txt=sanitize_text_for_pdf(title), ln=1, align='C')
-    pdf.set_font("Arial", size=10)
-    pdf.cell(200, 5, txt=f"Generated: {datetime.now().strftime('%Y-%m-%d %H:%M')}", ln=1, align='C')
+    pdf.set_font(font, size=16, style='B')
+    pdf.cell(200, 10, txt=clean(title), ln=1, align='C')
+    pdf.set_font(font, size=10)
+    pdf.cell(200, 5, txt=f"Generated: {now.strftime('%Y-%m-%d %H:%M')}", ln=1, align='C')
     pdf.ln(10)
     
     # Filter based on report type
     if report_type == "blockers_only":
-        projects = [p for p in projects if p.get('blocker', '-') not in ['-', 'None', '']]
+        projects = [p for p in projects if p.get('blocker', '-') not in _EMPTY_BLOCKERS]
         if not projects:
-            pdf.set_font("Arial", size=12)
-            pdf.cell(0, 10, txt=sanitize_text_for_pdf("[OK] No blockers found! All projects are on track."), ln=1)
-            filename = f"/tmp/report_blockers_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
+            pdf.set_font(font, size=12)
+            pdf.cell(0, 10, txt=clean("[OK] No blockers found! All projects are on track."), ln=1)
+            filename = _report_path("blockers", stamp)
             pdf.output(filename)
             return filename
     elif report_type == "summary":
         # Only show key info
-        pdf.set_font("Arial", size=12, style='B')
+        pdf.set_font(font, size=12, style='B')
         pdf.cell(0, 10, txt="Summary Report", ln=1)
-        pdf.set_font("Arial", size=10)
+        pdf.set_font(font, size=10)
         pdf.ln(5)
         
         for p in projects:
-            pdf.set_font("Arial", 'B', 11)
+            pdf.set_font(font, 'B', 11)
             pdf.set_fill_color(240, 240, 240)
             client_cat = f"{p.get('client')} - {p.get('category', 'N/A')}"
-            pdf.cell(0, 8, txt=sanitize_text_for_pdf(client_cat), ln=1, fill=True)
-            pdf.set_font("Arial", size=9)
-            status = sanitize_text_for_pdf(p.get('status', '-')[:100].replace('\n', ' '))
+            pdf.cell(0, 8, txt=clean(client_cat), ln=1, fill=True)
+            pdf.set_font(font, size=9)
+            status = clean(p.get('status', '-')[:100].replace('\n', ' '))
             pdf.multi_cell(0, 6, txt=f"Status: {status}")
             pdf.ln(3)
         
-        filename = f"/tmp/report_summary_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
+        filename = _report_path("summary", stamp)
         pdf.output(filename)
         return filename
     
     # Full report
     for idx, p in enumerate(projects, 1):
-        pdf.set_font("Arial", 'B', 12)
+        get = p.get
+        category, owner, developer = get('category', '-'), get('owner', '-'), get('developer', '-')
+        status, blocker, call = get('status', '-'), get('blocker', '-'), get('call')
+        
+        pdf.set_font(font, 'B', 12)
         pdf.set_fill_color(240, 240, 240)
-        client_name = sanitize_text_for_pdf(f"{idx}. Client: {p.get('client')}")
+        client_name = clean(f"{idx}. Client: {get('client')}")
         pdf.cell(0, 10, txt=client_name, ln=1, fill=True)
         
-        pdf.set_font("Arial", size=10)
+        pdf.set_font(font, size=10)
         
         # Category and team
-        category_team = f"Category: {p.get('category', '-')} | PM: {p.get('owner', '-')} | Dev: {p.get('developer', '-')}"
-        pdf.cell(0, 6, txt=sanitize_text_for_pdf(category_team), ln=1)
+        category_team = f"Category: {category} | PM: {owner} | Dev: {developer}"
+        pdf.cell(0, 6, txt=clean(category_team), ln=1)
         pdf.ln(2)
         
         # Status
-        status = sanitize_text_for_pdf(p.get('status', '-'))
-        pdf.set_font("Arial", 'B', 10)
+        status = clean(status)
+        pdf.set_font(font, 'B', 10)
         pdf.cell(0, 6, txt="Status:", ln=1)
-        pdf.set_font("Arial", size=9)
+        pdf.set_font(font, size=9)
         pdf.multi_cell(0, 5, txt=status.replace('\n', ' '))
         pdf.ln(2)
         
         # Blocker
-        blocker = p.get('blocker', '-')
-        if blocker and blocker not in ["-", "None", ""]:
+        if blocker and blocker not in _EMPTY_BLOCKERS:
             pdf.set_text_color(200, 0, 0)
-            pdf.set_font("Arial", 'B', 10)
+            pdf.set_font(font, 'B', 10)
             pdf.cell(0, 6, txt="[BLOCKER] Blocker:", ln=1)
-            pdf.set_font("Arial", size=9)
-            blocker_text = sanitize_text_for_pdf(blocker.replace('\n', ' '))
+            pdf.set_font(font, size=9)
+            blocker_text = clean(blocker.replace('\n', ' '))
             pdf.multi_cell(0, 5, txt=blocker_text)
             pdf.set_text_color(0, 0, 0)
             pdf.ln(2)
         
         # Next call
-        if p.get('call') and p.get('call') != "-":
-            pdf.set_font("Arial", size=9)
-            call_text = f"[CALL] Next Call: {p.get('call')}"
-            pdf.cell(0, 5, txt=sanitize_text_for_pdf(call_text), ln=1)
+        if call and call != "-":
+            pdf.set_font(font, size=9)
+            call_text = f"[CALL] Next Call: {call}"
+            pdf.cell(0, 5, txt=clean(call_text), ln=1)
         
         # Last updated
-        pdf.set_font("Arial", size=8, style='I')
-        pdf.cell(0, 5, f"Last Updated: {p.get('last_updated', '-')}", ln=1)
+        pdf.set_font(font, size=8, style='I')
+        pdf.cell(0, 5, f"Last Updated: {get('last_updated', '-')}", ln=1)
         
         pdf.ln(8)
         if idx < len(projects):
@@ -1119,7 +2160,7 @@ def generate_pdf_report(projects, title="Project Report", report_type="full"):
             pdf.line(10, pdf.get_y(), 200, pdf.get_y())
             pdf.ln(5)
         
-    filename = f"/tmp/report_{report_type}_{datetime.now().strftime('%Y%m%d%H%M')}.pdf"
+    filename = _report_path(report_type, stamp)
     pdf.output(filename)
     return filename
 
@@ -1138,7 +2179,7 @@ def command_download_pdf(ack, client, body):
     elif "blocker" in command_text or "blocked" in command_text:
         report_type = "blockers_only"
     
-    projects = load_db()
+    projects = load_db(readonly=True)
     context = get_request_context(channel_id)
     
     # SECURITY: If external, only give them their own data
@@ -1146,7 +2187,7 @@ def command_download_pdf(ack, client, body):
         if not context.get('client'):
             client.chat_postEphemeral(channel=channel_id, user=user_id, text="❌ Error: Client mapping not configured for this channel.")
             return
-        projects = [p for p in projects if p.get('client', '').lower() == context['client'].lower()]
+        projects = projects_by_client(projects).get(context['client'].lower(), [])
         title = f"Status Report: {context['client']}"
     else:
         title = "Internal Master Project Report"
@@ -1178,6 +2219,125 @@ def command_download_pdf(ack, client, body):
 # ==========================================
 # FEATURE: AI ENGINE (CONTEXT AWARE)
 # ==========================================
+# Project fields never shown outside the internal team
+_INTERNAL_FIELDS = frozenset(('internal_notes', 'budget'))
+
+# Project fields sent to the model (edit history and raw email previews stay out of prompts).
+# Internal scope also gets _INTERNAL_FIELDS; every scope gets the latest email summaries.
+AI_PROJECT_SCHEMA = ('client', 'status', 'category', 'owner', 'developer', 'blocker', 'call',
+                     'last_updated', 'last_contact_date', 'last_email_received', 'comm_channel')
+_AI_INTERNAL_SCHEMA = AI_PROJECT_SCHEMA + tuple(sorted(_INTERNAL_FIELDS))
+_AI_EMAIL_ENTRIES = 2
+
+def _slim_project(p, schema):
+    """Copy only the schema fields (that are set) plus the latest email summaries"""
+    slim = {k: p[k] for k in schema if k in p}
+    emails = p.get('email_history')
+    if emails:
+        slim['recent_emails'] = [
+            {'timestamp': e.get('timestamp'), 'summary': e.get('summary')}
+            for e in emails[-_AI_EMAIL_ENTRIES:]
+        ]
+    return slim
+
+def find_project(projects, client_name):
+    """Find a project by client name (case-insensitive)
+    
+    Readonly lists go through the memoized client index; a list the caller is editing
+    is scanned, since building an index for one lookup costs more than the scan.
+    
+    Returns:
+        dict: The first matching project, or None
+    """
+    name_lc = (client_name or '').lower()
+    if not _is_shared_parse(projects):
+        return next((p for p in projects if p.get('client', '').lower() == name_lc), None)
+    matches = projects_by_client(projects).get(name_lc)
+    return matches[0] if matches else None
+
+# (scope, client) -> (projects list it was built from, data context)
+_DATA_CONTEXT_CACHE = {}
+_DATA_CONTEXT_LOCK = threading.Lock()
+_DATA_CONTEXT_MAX = 64
+
+def build_data_context(projects, scope, target_client=None):
+    """Serialize the project data an AI prompt may see
+    
+    Results are cached per (scope, client) for as long as the same projects list is
+    passed in, so readonly loads (see load_db) only rebuild it when the data changes.
+    
+    Args:
+        projects: Project list, ideally from load_db(readonly=True)
+        scope: "client" (one client, sanitized), "partner" (all, sanitized) or "internal" (all, with internal fields)
+        target_client: Client name for the "client" scope
+    
+    Returns:
+        str: Minified JSON, or None if the client has no projects
+    """
+    key = (scope, (target_client or '').lower())
+    with _DATA_CONTEXT_LOCK:
+        hit = _DATA_CONTEXT_CACHE.get(key)
+    if hit and hit[0] is projects:
+        return hit[1]
+    
+    if scope == "client":
+        selected = projects_by_client(projects).get(key[1], [])
+    else:
+        selected = projects
+    
+    if scope == "client" and not selected:
+        data_context = None
+    else:
+        # Sanitize Data (internal fields only for internal scope) and drop what the model doesn't need
+        schema = _AI_INTERNAL_SCHEMA if scope == "internal" else AI_PROJECT_SCHEMA
+        data_context = _json_dumps([_slim_project(p, schema) for p in selected], pretty=False)
+    
+    with _DATA_CONTEXT_LOCK:
+        if len(_DATA_CONTEXT_CACHE) >= _DATA_CONTEXT_MAX:
+            _DATA_CONTEXT_CACHE.clear()
+        _DATA_CONTEXT_CACHE[key] = (projects, data_context)
+    return data_context
+
+def stream_completion_to_slack(stream, channel_id, message_ts, reply_func):
+    """Show a streamed chat completion in Slack as it arrives
+    
+    Edits the message at message_ts in place, flushing after 1, 3, 9, ... chunks (capped
+    at 50) so the first words show up fast without hitting chat.update rate limits.
+    Without a message_ts the full answer is sent once at the end.
+    
+    Returns:
+        str: The full response text
+    """
+    parts = []
+    pending = 0
+    flush_every = 1
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        pending += 1
+        if message_ts and pending >= flush_every:
+            app.client.chat_update(channel=channel_id, ts=message_ts, text="".join(parts))
+            pending = 0
+            flush_every = min(flush_every * 3, 50)
+    
+    text = "".join(parts)
+    if message_ts:
+        if pending or not parts:
+            app.client.chat_update(channel=channel_id, ts=message_ts, text=text or "🤷 No answer was generated.")
+    else:
+        reply_func(text)
+    return text
+
+# The Assistant gets this long to answer before the chat completion is started alongside it
+ASSISTANT_HEDGE_SECONDS = float(os.environ.get("ASSISTANT_HEDGE_SECONDS", "6"))
+# Assistant runs only (mentions and /ask); the chat completions never queue here
+ASSISTANT_WORKERS = int(os.environ.get("ASSISTANT_WORKERS", "8"))
+_ASSISTANT_POOL = ThreadPoolExecutor(max_workers=ASSISTANT_WORKERS, thread_name_prefix="assistant")
+
 def process_ai_query(user_query, channel_id, reply_func, user_email=None):
     """Process an AI query with role-based prompts from config.
     
@@ -1187,7 +2347,7 @@ def process_ai_query(user_query, channel_id, reply_func, user_email=None):
         reply_func: Function to send replies
         user_email: Optional user email for role detection
     """
-    projects = load_db()
+    projects = load_db(readonly=True)
     context = get_request_context(channel_id)
     channel_role = context['role']
     target_client = context['client']
@@ -1200,40 +2360,25 @@ def process_ai_query(user_query, channel_id, reply_func, user_email=None):
         target_client = get_merchant_client(user_email)
 
     # --- SECURITY FILTERING ---
+    # (data_context is minified: the model doesn't need indentation, and it's ~25% of the prompt tokens)
     if channel_role == 'external' or user_role == 'merchant':
         if not target_client:
             reply_func("❌ Error: Client mapping not configured for this channel.")
             return
-        # 1. Filter Data
-        projects = [p for p in projects if p.get('client', '').lower() == target_client.lower()]
-        if not projects:
+        # Only this client's projects, without internal fields
+        data_context = build_data_context(projects, "client", target_client)
+        if data_context is None:
             reply_func("I can only discuss project details related to this channel.")
             return
-        
-        # 2. Sanitize Data (Remove internal fields)
-        safe_projects = []
-        for p in projects:
-            safe_p = {k: v for k, v in p.items() if k not in ['internal_notes', 'budget']}
-            safe_projects.append(safe_p)
-            
-        # Get role-based prompt
-        system_prompt = get_system_prompt(user_email, target_client)
-        data_context = json.dumps(safe_projects, indent=2)
-    
     elif user_role == 'partner':
         # Partners can see all projects but with limited internal info
-        safe_projects = []
-        for p in projects:
-            safe_p = {k: v for k, v in p.items() if k not in ['internal_notes', 'budget']}
-            safe_projects.append(safe_p)
-        
-        system_prompt = get_system_prompt(user_email, target_client)
-        data_context = json.dumps(safe_projects, indent=2)
-
+        data_context = build_data_context(projects, "partner")
     else:
         # Internal Team Context - full access
-        system_prompt = get_system_prompt(user_email, target_client)
-        data_context = json.dumps(projects, indent=2)
+        data_context = build_data_context(projects, "internal")
+    
+    # Get role-based prompt
+    system_prompt = get_system_prompt(user_email, target_client)
 
     # --- OPENAI CALL ---
     if not ai_client:
@@ -1243,35 +2388,79 @@ def process_ai_query(user_query, channel_id, reply_func, user_email=None):
     try:
         # Show thinking message immediately
         thinking_msg = f"🧠 *Thinking about: {user_query[:50]}{'...' if len(user_query) > 50 else ''}*"
-        reply_func(thinking_msg)
-        
-        # Try using Assistant first (if configured), fallback to chat completion
-        # Use shorter timeout to avoid Slack command timeout
-        assistant_response = query_assistant(user_query, channel_id, timeout=20)
+        thinking = reply_func(thinking_msg)
+        # say() returns the posted message; its ts lets the fallback stream into it
+        thinking_ts = thinking.get("ts") if hasattr(thinking, "get") else None
+        
+        # Try using Assistant first (if configured), fallback to chat completion.
+        # The Assistant runs in the background; if it hasn't answered within the hedge
+        # delay, the chat completion streams the answer instead of waiting it out.
+        assistant_future = _ASSISTANT_POOL.submit(query_assistant, user_query, channel_id, timeout=20)
+        try:
+            assistant_response = assistant_future.result(timeout=ASSISTANT_HEDGE_SECONDS)
+        except FutureTimeoutError:
+            # Still queued (pool busy with earlier runs): drop it rather than run it for nobody.
+            # Already running: left alone; its run cancels itself on timeout and a late answer
+            # still fills the cache
+            assistant_future.cancel()
+            assistant_response = None
         if assistant_response:
             reply_func(assistant_response)
             return
         
         # Fallback to regular chat completion (faster, more reliable)
-        print("📝 Using fallback chat completion (Assistant timeout or not available)")
-        response = ai_client.chat.completions.create(
+        print("📝 Using fallback chat completion (Assistant slow or not available)")
+        chat_client = ai_client.with_options(timeout=OPENAI_CHAT_TIMEOUT, max_retries=OPENAI_CHAT_RETRIES)
+        response = chat_client.chat.completions.create(
             model=OPENAI_MODEL,
             messages=[
-                {"role": "system", "content": f"{system_prompt}\n\nPROJECT DATA:\n{data_context}"},
+                {"role": "system", "content": _PROMPT_TEMPLATE.format(system_prompt=system_prompt, data_context=data_context)},
                 {"role": "user", "content": user_query}
             ],
-            timeout=15  # Add timeout to chat completion too
+            max_tokens=OPENAI_ANSWER_MAX_TOKENS,
+            stream=True
         )
-        reply_func(response.choices[0].message.content)
+        stream_completion_to_slack(response, channel_id, thinking_ts, reply_func)
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ AI Error: {error_msg}")
+        logger.exception("❌ AI Error")
         # Provide user-friendly error message
         if "timeout" in error_msg.lower() or "timed out" in error_msg.lower():
             reply_func("⏱️ Request timed out. The AI is taking too long to respond. Please try a simpler question or try again later.")
         else:
             reply_func(f"❌ AI Error: {error_msg[:200]}")
 
+# AI answers run here so event handlers return (and Bolt acks) well inside Slack's 3s window
+AI_QUERY_WORKERS = int(os.environ.get("AI_QUERY_WORKERS", "8"))
+_AI_EXECUTOR = ThreadPoolExecutor(max_workers=AI_QUERY_WORKERS, thread_name_prefix="ai-query")
+
+def _answer_mention(text, channel, say, user_id, client):
+    """Worker: resolve the user's role and answer a mention (posts Thinking..., then edits it)"""
+    try:
+        user_email = get_user_email(user_id, client)
+        process_ai_query(text, channel, say, user_email)
+    except Exception:
+        logger.exception("❌ Mention Error")
+
+_MENTION_RE = re.compile(r"<@[^>]*>")
+
+def _route_update(say, text, channel, user_id, client):
+    say(text="Update Project:", blocks=[
+        {"type": "section", "text": {"type": "mrkdwn", "text": "Click to update:"},
+         "accessory": {"type": "button", "text": {"type": "plain_text", "text": "Update"}, "action_id": "trigger_update_flow"}}
+    ])
+
+def _route_pdf(say, text, channel, user_id, client):
+    # Trigger the PDF logic manually if they ask "Give me a PDF report"
+    # We need to simulate the body structure for the command function, or just call logic directly
+    say("Please use the `/download-report` command for PDFs.")
+
+# Mention routing: first entry whose keywords all appear in the (lowercased) text wins
+_MENTION_ROUTES = (
+    (("update", "project"), _route_update),
+    (("report", "pdf"), _route_pdf),
+)
+
 # ==========================================
 # FEATURE: MAILBOX & EVENTS
 # ==========================================
@@ -1290,31 +2479,63 @@ def handle_mentions(event, say, client):
         )
         return
     
-    text = re.sub(r"<@.*?>", "", event['text']).strip()
+    text = _MENTION_RE.sub("", event['text']).strip()
     channel = event['channel']
     
     # Routing
-    if "update" in text.lower() and "project" in text.lower():
-        say(text="Update Project:", blocks=[
-            {"type": "section", "text": {"type": "mrkdwn", "text": "Click to update:"},
-             "accessory": {"type": "button", "text": {"type": "plain_text", "text": "Update"}, "action_id": "trigger_update_flow"}}
-        ])
-    elif "report" in text.lower() and "pdf" in text.lower():
-        # Trigger the PDF logic manually if they ask "Give me a PDF report"
-        # We need to simulate the body structure for the command function, or just call logic directly
-        say("Please use the `/download-report` command for PDFs.")
+    lowered = text.lower()
+    for keywords, route in _MENTION_ROUTES:
+        if all(k in lowered for k in keywords):
+            route(say, text, channel, user_id, client)
+            break
     else:
-        # Default to AI - get user email for role-based prompt
-        user_email = get_user_email(user_id, client)
-        process_ai_query(text, channel, say, user_email)
+        # Default to AI (in the background) - the worker looks up the user email for the role-based prompt
+        _AI_EXECUTOR.submit(_answer_mention, text, channel, say, user_id, client)
+
+if MSGSPEC_AVAILABLE:
+    class EmailExtract(msgspec.Struct):
+        """Fields the email parser is asked to return (unset if the model left one out)"""
+        client: str | msgspec.UnsetType = msgspec.UNSET
+        status: str | msgspec.UnsetType = msgspec.UNSET
+        blocker: str | msgspec.UnsetType = msgspec.UNSET
+        summary: str | msgspec.UnsetType = msgspec.UNSET
+
+def _parse_email_extract(content):
+    """Parse the email parser's JSON output into a dict
+    
+    With msgspec installed, output of the expected shape is decoded and validated in one
+    pass (keys the model left out stay absent); anything else falls back to a plain parse.
+    """
+    if MSGSPEC_AVAILABLE:
+        try:
+            return msgspec.to_builtins(msgspec.json.decode(content, type=EmailExtract))
+        except msgspec.ValidationError:
+            pass
+    return _json_loads(content)
+
+EMAIL_HISTORY_LIMIT = 10  # Email entries kept per project
+
+# Returned by process_email_for_status_update for an email it already recorded
+EMAIL_ALREADY_PROCESSED = "already_processed"
 
 def process_email_for_status_update(text, channel_id=None, event_ts=None, user_id=None):
-    """Enhanced email processing: updates status and logs brief history"""
+    """Enhanced email processing: updates status and logs brief history
+    
+    Returns:
+        The extracted fields on success, EMAIL_ALREADY_PROCESSED for a redelivered email
+        (already in a project's history), or None if it couldn't be matched/parsed
+    """
     if not ai_client:
         return None
     
+    # Stamped once, on arrival (not after the parse), and reused for every field below
+    email_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
     try:
         projects = load_db()
+        # An email already on record (e.g. a redelivered event) needs no parse and no rewrite
+        if event_ts and any(e.get("slack_ts") == event_ts for p in projects for e in p.get("email_history", ())):
+            logger.info("ℹ️ Email %s already recorded, skipping", event_ts)
+            return EMAIL_ALREADY_PROCESSED
         client_names = [p.get("client", "") for p in projects]
         
         # Enhanced prompt to get better summaries
@@ -1337,10 +2558,12 @@ def process_email_for_status_update(text, channel_id=None, event_ts=None, user_i
                 {"role": "system", "content": "You are a project status parser. Always return valid JSON."},
                 {"role": "user", "content": prompt + "\n\nEmail content:\n" + text}
             ],
+            max_tokens=OPENAI_PARSER_MAX_TOKENS,
+            temperature=0,
             timeout=15
         )
         
-        result = json.loads(response.choices[0].message.content)
+        result = _parse_email_extract(response.choices[0].message.content)
         client_name = result.get("client", "").strip()
         
         if not client_name:
@@ -1348,55 +2571,102 @@ def process_email_for_status_update(text, channel_id=None, event_ts=None, user_i
         
         # Find and update project
         updated = False
-        email_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
         
-        for p in projects:
-            if p.get("client", "").lower() == client_name.lower():
-                # 1. Initialize email_history if missing
-                if "email_history" not in p:
-                    p["email_history"] = []
-                
-                # 2. Create the new entry
-                email_entry = {
-                    "timestamp": email_timestamp,
-                    "summary": result.get("summary", "Update received"),
-                    "status_extracted": result.get("status", ""),
-                    "raw_text_preview": text[:150] + "..." if len(text) > 150 else text, # Limit preview text
-                    "slack_ts": event_ts
-                }
-                
-                # 3. Append and strict limit (Keep only last 10 to save space)
-                p["email_history"].append(email_entry)
-                if len(p["email_history"]) > 10:
-                    p["email_history"] = p["email_history"][-10:]
-                
-                # 4. Update Main Status Fields
-                if result.get("status"):
-                    p["status"] = result.get("status")
-                if result.get("blocker"):
-                    p["blocker"] = result.get("blocker")
-                    
-                p["last_updated"] = email_timestamp
-                p["last_email_received"] = email_timestamp
-                p["comm_channel"] = "Email" # Auto-mark channel as Email
-                updated = True
-                break
+        p = find_project(projects, client_name)
+        if p:
+            # 1. Initialize email_history if missing
+            history = p.setdefault("email_history", [])
+            
+            # 2. Create the new entry
+            email_entry = {
+                "timestamp": email_timestamp,
+                "summary": result.get("summary", "Update received"),
+                "status_extracted": result.get("status", ""),
+                "raw_text_preview": text[:150] + "..." if len(text) > 150 else text, # Limit preview text
+                "slack_ts": event_ts
+            }
+            
+            # 3. Append and strict limit (Keep only the last few to save space), trimmed in place
+            history.append(email_entry)
+            del history[:-EMAIL_HISTORY_LIMIT]
+            
+            # 4. Update Main Status Fields
+            if result.get("status"):
+                p["status"] = result.get("status")
+            if result.get("blocker"):
+                p["blocker"] = result.get("blocker")
+            
+            p["last_updated"] = email_timestamp
+            p["last_email_received"] = email_timestamp
+            p["comm_channel"] = "Email" # Auto-mark channel as Email
+            updated = True
         
         if updated:
-            save_db(projects)
-            # Sync to knowledge base so AI memory is up to date
-            sync_all_data_to_openai()
+            target_channel = CHANNEL_ID_REPORT or MAILBOX_CHANNEL_ID
+            on_save_done(
+                save_db(projects), f"email update for '{client_name}'",
+                on_failure=lambda: target_channel and notify_mailbox(
+                    target_channel,
+                    f"❌ *Email update for {client_name} could not be saved*\n"
+                    f"The status change above isn't in the database yet; it will be retried."
+                )
+            )
+            # Sync to knowledge base so AI memory is up to date (debounced, in the background)
+            schedule_knowledge_sync()
             return result
         else:
-            print(f"⚠️ Client '{client_name}' not found in database")
+            logger.warning("⚠️ Client '%s' not found in database", client_name)
             return None
             
-    except Exception as e:
-        print(f"❌ Error processing email: {e}")
-        import traceback
-        traceback.print_exc()
+    except Exception:
+        logger.exception("❌ Error processing email")
         return None
 
+# Mailbox notices: the first one posts right away and opens a short window; notices arriving
+# inside it (a burst of forwarded emails) go out together as one message
+MAILBOX_BATCH_SECONDS = 2
+MAILBOX_BATCH_MAX = 10
+_MAILBOX_NOTICES = {}  # channel -> notices waiting for the window to close
+_MAILBOX_NOTICES_LOCK = threading.Lock()
+
+def _post_mailbox_notices(channel, notices):
+    try:
+        if len(notices) == 1:
+            app.client.chat_postMessage(channel=channel, text=notices[0])
+            return
+        blocks = [{"type": "section", "text": {"type": "mrkdwn", "text": f"📬 *{len(notices)} mailbox items processed*"}}]
+        for notice in notices:
+            blocks.append({"type": "divider"})
+            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": notice}})
+        app.client.chat_postMessage(channel=channel, blocks=blocks, text=f"📬 {len(notices)} mailbox items processed")
+    except Exception:
+        logger.exception("❌ Mailbox notice error")
+
+def _flush_mailbox_notices(channel, close=True):
+    """Post what's waiting for channel; close=True also ends the batching window"""
+    with _MAILBOX_NOTICES_LOCK:
+        notices = _MAILBOX_NOTICES.pop(channel, None) if close else _MAILBOX_NOTICES.get(channel)
+        if not close and notices:
+            _MAILBOX_NOTICES[channel] = []
+    if notices:
+        _post_mailbox_notices(channel, notices)
+
+def notify_mailbox(channel, text):
+    """Post a mailbox notice, batching bursts into one message"""
+    with _MAILBOX_NOTICES_LOCK:
+        pending = _MAILBOX_NOTICES.get(channel)
+        if pending is None:
+            _MAILBOX_NOTICES[channel] = []
+        else:
+            pending.append(text)
+    if pending is None:
+        timer = threading.Timer(MAILBOX_BATCH_SECONDS, _flush_mailbox_notices, args=(channel,))
+        timer.daemon = True
+        timer.start()
+        _post_mailbox_notices(channel, [text])
+    elif len(pending) >= MAILBOX_BATCH_MAX:
+        _flush_mailbox_notices(channel, close=False)
+
 @app.event("message")
 def handle_message_events(event, say, client):
     channel_id = event.get("channel")
@@ -1428,25 +2698,27 @@ def handle_message_events(event, say, client):
         if text:
             print(f"📬 Processing email from mailbox channel: {text[:100]}...")
             result = process_email_for_status_update(text, channel_id, event_ts, user_id)
+            if result == EMAIL_ALREADY_PROCESSED:
+                return  # Its notice went out the first time
             target_channel = CHANNEL_ID_REPORT or MAILBOX_CHANNEL_ID
             if result:
                 client_name = result.get("client", "Unknown")
                 summary = result.get("summary", "Status updated")
                 if target_channel:
-                    say(
+                    notify_mailbox(
+                        target_channel,
                         f"📬 *Email Processed & Status Updated*\n"
                         f"*Client:* {client_name}\n"
                         f"*Summary:* {summary}\n"
                         f"✅ Project status automatically updated!\n"
-                        f"📧 Email entry logged in project history.",
-                        channel=target_channel
+                        f"📧 Email entry logged in project history."
                     )
             else:
                 if target_channel:
-                    say(
+                    notify_mailbox(
+                        target_channel,
                         f"📬 *New Mailbox Item* (Manual review needed)\n"
-                        f"Could not automatically identify client or extract status from email.",
-                        channel=target_channel
+                        f"Could not automatically identify client or extract status from email."
                     )
     
     # 2. INGEST SLACK MESSAGES INTO KNOWLEDGE BASE (from internal/external channels)
@@ -1455,6 +2727,19 @@ def handle_message_events(event, say, client):
 # ==========================================
 # FEATURE: DAILY SCHEDULER
 # ==========================================
+def _section(text):
+    return {"type": "section", "text": {"type": "mrkdwn", "text": text}}
+
+def _project_block(p, status_len=150):
+    """Daily report line for an active project"""
+    return _section(f"*{p['client']}* | Dev: {p.get('developer', '-')}\n{(p.get('status') or '-')[:status_len]}")
+
+def _stuck_block(p):
+    """Daily report line for a stuck project, with its blocker"""
+    blocker = p.get('blocker') or '-'
+    blocker = blocker[:100] if blocker not in ('-', 'None') else 'None'
+    return _section(f"*{p['client']}*\nStatus: {(p.get('status') or '-')[:100]}\n⛔ Blocker: {blocker}")
+
 def scheduled_daily_report():
     """Enhanced daily report with insights and sync to knowledge base"""
     print("⏰ Running Daily Report...")
@@ -1463,7 +2748,7 @@ def scheduled_daily_report():
         return
     
     try:
-        projects = load_db()
+        projects = load_db(readonly=True)
         if not projects:
             app.client.chat_postMessage(
                 channel=CHANNEL_ID_REPORT,
@@ -1472,18 +2757,8 @@ def scheduled_daily_report():
             return
         
         # Categorize projects
-        categories = {
-            "Stuck / On Hold": [],
-            "New / In Progress": [],
-            "Almost Ready": [],
-            "Ready / Scheduled": [],
-            "Launched": []
-        }
-        
-        for p in projects:
-            cat = p.get('category', 'Other')
-            if cat in categories:
-                categories[cat].append(p)
+        grouped = _categorize(projects)
+        categories = {cat: grouped.get(cat, []) for cat in ("Stuck / On Hold", "New / In Progress", "Almost Ready", "Ready / Scheduled", "Launched")}
         
         # Build report
         blocks = [
@@ -1493,56 +2768,49 @@ def scheduled_daily_report():
         
         # Priority items (stuck projects)
         if categories["Stuck / On Hold"]:
-            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": "*🔴 Priority: Stuck Projects*"}})
-            for p in categories["Stuck / On Hold"]:
-                blocker = p.get('blocker', '-')
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*{p['client']}*\nStatus: {p.get('status', '-')[:100]}\n⛔ Blocker: {blocker[:100] if blocker not in ['-', 'None'] else 'None'}"
-                    }
-                })
+            blocks.append(_section("*🔴 Priority: Stuck Projects*"))
+            blocks.extend(_stuck_block(p) for p in categories["Stuck / On Hold"])
             blocks.append({"type": "divider"})
         
         # Active projects
         active = categories["New / In Progress"] + categories["Almost Ready"]
         if active:
-            blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*🔵 Active Projects ({len(active)})*"}})
-            for p in active[:5]:  # Top 5
-                blocks.append({
-                    "type": "section",
-                    "text": {
-                        "type": "mrkdwn",
-                        "text": f"*{p['client']}* | Dev: {p.get('developer', '-')}\n{p.get('status', '-')[:150]}"
-                    }
-                })
+            blocks.append(_section(f"*🔵 Active Projects ({len(active)})*"))
+            blocks.extend(_project_block(p) for p in active[:5])  # Top 5
             blocks.append({"type": "divider"})
         
         # Summary stats
         stats = f"📈 *Summary:* {len(categories['Launched'])} Launched | {len(categories['Ready / Scheduled'])} Ready | {len(active)} Active | {len(categories['Stuck / On Hold'])} Stuck"
-        blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": stats}})
+        blocks.append(_section(stats))
         
         app.client.chat_postMessage(channel=CHANNEL_ID_REPORT, blocks=blocks, text="Daily Report")
         
         # Sync to knowledge base after report
-        sync_all_data_to_openai()
-        print("✅ Daily report sent and knowledge base synced")
+        schedule_knowledge_sync(delay=0)
+        print("✅ Daily report sent, knowledge base sync queued")
         
-    except Exception as e:
-        print(f"❌ Scheduler Error: {e}")
+    except Exception:
+        logger.exception("❌ Scheduler Error")
 
 scheduler = BackgroundScheduler()
 # Run Monday-Friday at 9:00 AM (Server Time)
 scheduler.add_job(scheduled_daily_report, 'cron', day_of_week='mon-fri', hour=9)
+# Retry Gist writes left pending by a failed flush (saves flush themselves in the background)
+scheduler.add_job(flush_gist_writes, 'interval', seconds=30, max_instances=1, coalesce=True)
 scheduler.start()
 
 # ==========================================
 # FEATURE: PUBLISH REPORT
 # ==========================================
-def generate_and_send_report(client, channel_id):
-    """Generate and send a formatted report to the specified channel"""
-    projects = load_db()
+def generate_and_send_report(client, channel_id, projects=None, grouped=None):
+    """Generate and send a formatted report to the specified channel
+    
+    Args:
+        projects: Pre-loaded project list (loaded readonly if omitted)
+        grouped: Pre-computed _categorize(projects) result
+    """
+    if projects is None:
+        projects = load_db(readonly=True)
     if not projects:
         client.chat_postMessage(channel=channel_id, text="❌ No projects found!")
         return
@@ -1552,14 +2820,13 @@ def generate_and_send_report(client, channel_id):
         {"type": "divider"}
     ]
     categories = ["Launched", "Ready / Scheduled", "Almost Ready", "New / In Progress", "Stuck / On Hold"]
-    grouped = {cat: [] for cat in categories}
-    for p in projects:
-        grouped.setdefault(p.get("category", "Other"), []).append(p)
+    if grouped is None:
+        grouped = _categorize(projects)
     
     emojis = {"Launched": "🎉", "Ready / Scheduled": "🟢", "Almost Ready": "🟡", "New / In Progress": "🔵", "Stuck / On Hold": "🔴"}
 
     for category in categories:
-        if not grouped[category]:
+        if not grouped.get(category):
             continue
         emoji = emojis.get(category, "📁")
         blocks.append({"type": "section", "text": {"type": "mrkdwn", "text": f"*{emoji} {category}*"}})
@@ -1595,245 +2862,347 @@ def command_publish_report(ack, client, body):
 # ==========================================
 # FEATURE: PROJECT HISTORY
 # ==========================================
-@app.command("/project-history")
-@require_authorization
-def command_project_history(ack, respond, command, body):
-    """View change history for a project (Threaded)"""
-    ack()
+@functools.lru_cache(maxsize=256)
+def _history_field_label(field):
+    """Display label for a history field name (e.g. 'next_steps' -> 'Next Steps')"""
+    return field.replace('_', ' ').title()
+
+def _find_project_or_reject(client_name, respond, channel_id, usage):
+    """Look up the project a history command asked for, replying with the reason if it can't be shown
     
-    def process_history():
-        user_id = body.get('user_id')
-        channel_id = body.get('channel_id')
-        
-        # Get client name from command text
-        client_name = command.get('text', '').strip()
-        
-        if not client_name:
-            respond(
-                text="Please specify a client name. Example: `/project-history Avvika`",
-                response_type="ephemeral"
-            )
-            return
-        
-        projects = load_db()
-        project = None
-        
-        # Find the project
-        for p in projects:
-            if p.get("client", "").lower() == client_name.lower():
-                project = p
-                break
-        
-        if not project:
-            respond(
-                text=f"❌ Project '{client_name}' not found.",
-                response_type="ephemeral"
-            )
-            return
-        
-        # Check authorization for external users
-        context = get_request_context(channel_id)
-        if context.get('role') == 'external':
-            target_client = context.get('client')
-            if project.get('client', '').lower() != target_client.lower():
-                respond(
-                    text="❌ You can only view history for your own project.",
-                    response_type="ephemeral"
-                )
-                return
-        
-        # Get history
-        history = project.get("history", [])
-        
-        if not history:
+    Returns:
+        dict: The project, or None (the user has already been told why)
+    """
+    if not client_name:
+        respond(
+            text=f"Please specify a client name. Example: `{usage} Avvika`",
+            response_type="ephemeral"
+        )
+        return None
+    
+    project = find_project(load_db(readonly=True), client_name)
+    
+    if not project:
+        respond(
+            text=f"❌ Project '{client_name}' not found.",
+            response_type="ephemeral"
+        )
+        return None
+    
+    # Check authorization for external users
+    context = get_request_context(channel_id)
+    if context.get('role') == 'external':
+        target_client = context.get('client')
+        if project.get('client', '').lower() != target_client.lower():
             respond(
-                text=f"📋 *{project.get('client')}* - No change history yet.\n\nThis project hasn't been updated since history tracking was enabled.",
+                text="❌ You can only view history for your own project.",
                 response_type="ephemeral"
             )
-            return
+            return None
+    return project
+
+def _truncate(value, length):
+    return value[:length - 3] + "..." if len(value) > length else value
+
+def _format_history(project, limit=None, trunc=50):
+    """Format a project's change history, most recent first
+    
+    Args:
+        project: Project with a non-empty 'history'
+        limit: Show only the latest N entries (None = full history)
+        trunc: Max length of each old/new value
+    
+    Returns:
+        str: Slack mrkdwn text
+    """
+    history = project.get("history", [])
+    client = project.get('client')
+    if limit:
+        parts = [
+            f"📋 *Change History for {client}*\n\n",
+            f"*Total Updates:* {len(history)}\n",
+            f"*Last Updated:* {project.get('last_updated', 'N/A')}\n\n",
+            f"*Recent Changes (Last {limit}):*\n\n",
+        ]
+        entries = history[-limit:]
+    else:
+        parts = [
+            f"📋 *Full Change History for {client}*\n\n",
+            f"*Total Updates:* {len(history)}\n\n",
+        ]
+        entries = history
+    
+    for idx, entry in enumerate(reversed(entries), 1):
+        timestamp = entry.get("timestamp", "Unknown")
+        user = entry.get("user", "Unknown")
         
-        # Format history (show last 10 entries)
-        history_text = f"📋 *Change History for {project.get('client')}*\n\n"
-        history_text += f"*Total Updates:* {len(history)}\n"
-        history_text += f"*Last Updated:* {project.get('last_updated', 'N/A')}\n\n"
-        history_text += "*Recent Changes (Last 10):*\n\n"
-        
-        # Show most recent first
-        for entry in reversed(history[-10:]):
-            timestamp = entry.get("timestamp", "Unknown")
-            user = entry.get("user", "Unknown")
-            changes = entry.get("changes", {})
-            
-            history_text += f"🕐 *{timestamp}* by `{user}`\n"
-            
-            for field, change in changes.items():
-                field_name = field.replace('_', ' ').title()
-                old_val = change.get('old', '-')
-                new_val = change.get('new', '-')
-                
-                # Truncate long values
-                if len(old_val) > 50:
-                    old_val = old_val[:47] + "..."
-                if len(new_val) > 50:
-                    new_val = new_val[:47] + "..."
-                
-                history_text += f"   • *{field_name}:* `{old_val}` → `{new_val}`\n"
-            
-            history_text += "\n"
+        if limit:
+            parts.append(f"🕐 *{timestamp}* by `{user}`\n")
+        else:
+            parts.append(f"*{idx}. {timestamp}* by `{user}`\n")
         
-        if len(history) > 10:
-            history_text += f"\n_Showing last 10 of {len(history)} total changes. Use `/project-history-full {client_name}` to see all._"
+        for field, change in entry.get("changes", {}).items():
+            old_val = _truncate(change.get('old', '-'), trunc)
+            new_val = _truncate(change.get('new', '-'), trunc)
+            parts.append(f"   • *{_history_field_label(field)}:* `{old_val}` → `{new_val}`\n")
         
-        respond(text=history_text, response_type="ephemeral")
+        parts.append("\n")
+    
+    if limit and len(history) > limit:
+        parts.append(f"\n_Showing last {limit} of {len(history)} total changes. Use `/project-history-full {client}` to see all._")
+    return "".join(parts)
 
-    # Start background thread
-    threading.Thread(target=process_history).start()
+def _respond_with_history(respond, command, body, usage, limit, trunc):
+    """Background worker shared by the history commands"""
+    client_name = command.get('text', '').strip()
+    project = _find_project_or_reject(client_name, respond, body.get('channel_id'), usage)
+    if not project:
+        return
+    
+    if not project.get("history"):
+        text = f"📋 *{project.get('client')}* - No change history yet."
+        if limit:
+            text += "\n\nThis project hasn't been updated since history tracking was enabled."
+        respond(text=text, response_type="ephemeral")
+        return
+    
+    respond(text=_format_history(project, limit, trunc), response_type="ephemeral")
+
+@app.command("/project-history")
+@require_authorization
+def command_project_history(ack, respond, command, body):
+    """View change history for a project (Threaded)"""
+    ack()
+    threading.Thread(target=_respond_with_history, args=(respond, command, body, "/project-history", 10, 50)).start()
 
 @app.command("/project-history-full")
 @require_authorization
 def command_project_history_full(ack, respond, command, body):
     """View full change history for a project (Threaded)"""
     ack()
-    
     # Run heavy lifting in background thread to prevent timeout
-    def process_history():
-        user_id = body.get('user_id')
-        channel_id = body.get('channel_id')
-        
-        # Get client name from command text
-        client_name = command.get('text', '').strip()
-        
-        if not client_name:
-            respond(
-                text="Please specify a client name. Example: `/project-history-full Avvika`",
-                response_type="ephemeral"
-            )
-            return
-        
-        projects = load_db()
-        project = None
-        
-        # Find the project
-        for p in projects:
-            if p.get("client", "").lower() == client_name.lower():
-                project = p
-                break
-        
-        if not project:
-            respond(
-                text=f"❌ Project '{client_name}' not found.",
-                response_type="ephemeral"
-            )
-            return
-        
-        # Check authorization for external users
-        context = get_request_context(channel_id)
-        if context.get('role') == 'external':
-            target_client = context.get('client')
-            if project.get('client', '').lower() != target_client.lower():
-                respond(
-                    text="❌ You can only view history for your own project.",
-                    response_type="ephemeral"
+    threading.Thread(target=_respond_with_history, args=(respond, command, body, "/project-history-full", None, 80)).start()
+# ==========================================
+# FEATURE: ASK COMMAND (THREADED FIX)
+# ==========================================
+
+# /ask answers are ephemeral, so they can't be chat_update'd: partial text replaces the
+# Thinking message through the response_url instead, which Slack allows 5 times per command
+# (Thinking + these + the final answer must stay within that)
+ASK_STREAM_FIRST_UPDATE = 1.5  # Seconds before the first partial answer is shown
+ASK_STREAM_MAX_UPDATES = 2
+# How long a finished fallback answer waits for the Assistant (the preferred answer)
+ASK_ASSISTANT_GRACE_SECONDS = float(os.environ.get("ASK_ASSISTANT_GRACE_SECONDS", "4"))
+# Overall wait for an /ask answer (the Assistant run itself is capped at 60s)
+ASK_ANSWER_DEADLINE_SECONDS = float(os.environ.get("ASK_ANSWER_DEADLINE_SECONDS", "75"))
+# /ask fallbacks get their own threads, one per /ask worker, so they never queue behind
+# Assistant runs on _ASSISTANT_POOL and really do start alongside them
+_ASK_FALLBACK_POOL = ThreadPoolExecutor(max_workers=AI_QUERY_WORKERS, thread_name_prefix="ask-fallback")
+
+def _ask_fallback_completion(fallback_prompt, query_text, respond=None, settled=None, respond_lock=None,
+                             primary=None):
+    """The /ask chat completion fallback (The "Dumb" Fallback), streamed
+    
+    Args:
+        respond: If given, show the partial answer while it streams in
+        settled: Event set once the final answer is out; partial updates stop then
+        respond_lock: Lock held while checking settled and responding
+        primary: The Assistant's future; partials are only shown once it has come back
+            without an answer, since until then its answer is the one the user will get
+    
+    Returns:
+        str: The full response text
+    """
+    stream = ai_client.chat.completions.create(
+        model=OPENAI_MODEL,
+        messages=[
+            {"role": "system", "content": fallback_prompt},
+            {"role": "user", "content": query_text}
+        ],
+        max_tokens=OPENAI_ANSWER_MAX_TOKENS,
+        stream=True
+    )
+    parts = []
+    start = time.monotonic()
+    next_update, updates = ASK_STREAM_FIRST_UPDATE, 0
+    for chunk in stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta.content
+        if not delta:
+            continue
+        parts.append(delta)
+        if (respond and updates < ASK_STREAM_MAX_UPDATES and time.monotonic() - start >= next_update
+                and (primary is None or (primary.done() and not _future_answer(primary)))):
+            with respond_lock:
+                if settled.is_set():
+                    respond = None
+                else:
+                    respond(text="".join(parts) + " …", response_type="ephemeral", replace_original=True)
+            updates += 1
+            next_update *= 3
+    return "".join(parts)
+
+def _future_answer(future):
+    """A finished future's result, or None if it failed"""
+    try:
+        return future.result()
+    except Exception:
+        return None
+
+def _first_answer(primary, secondary, grace=0.0, timeout=None):
+    """Return the first usable answer from two concurrent futures, preferring primary
+    
+    Args:
+        primary: Future for the preferred answer (None/empty means no answer)
+        secondary: Future for the fallback answer, or None
+        grace: Seconds a ready secondary answer waits for the primary to finish; None
+               waits until the primary comes back (empty) before using the secondary
+        timeout: Overall seconds to wait (None waits for both futures)
+    
+    Returns:
+        str: The answer, or None if neither produced one. If the secondary failed and
+        the primary had nothing, the failure is raised.
+    
+    Raises:
+        TimeoutError: Nothing usable arrived before the overall timeout
+    """
+    results, error = {}, None
+    pending = {f for f in (primary, secondary) if f is not None}
+    give_up = None if timeout is None else time.monotonic() + timeout
+    deadline = None
+    while pending:
+        wake = min((t for t in (deadline, give_up) if t is not None), default=None)
+        done, pending = wait(pending, timeout=None if wake is None else max(0.0, wake - time.monotonic()),
+                             return_when=FIRST_COMPLETED)
+        if not done:
+            # Out of time: a future that never got a thread is dropped; a running one
+            # keeps going (threads can't be cancelled, and a late Assistant answer still fills its cache)
+            for future in pending:
+                future.cancel()
+            if results.get(secondary):
+                return results[secondary]
+            raise FutureTimeoutError(f"AI request timeout after {timeout:.0f}s")
+        for future in done:
+            try:
+                results[future] = future.result()
+            except Exception as e:
+                print(f"⚠️ AI request failed: {e}")
+                results[future], error = None, e
+        if results.get(primary):
+            return results[primary]
+        if results.get(secondary):
+            if primary not in pending:
+                return results[secondary]
+            if grace is not None and deadline is None:
+                deadline = time.monotonic() + grace
+    if error is not None:
+        raise error
+    return None
+
+# /ask query intent (one case-insensitive scan each; plurals and -ly forms count)
+_RECENCY_KEYWORDS_RE = re.compile(r'\b(?:latest|recent(?:ly)?|last|newest|today|yesterday|this week)\b', re.IGNORECASE)
+_EMAIL_KEYWORDS_RE = re.compile(r'\b(?:e?mails?|mailbox(?:es)?|messages?|communications?|said|wrote)\b', re.IGNORECASE)
+
+def _compute_ask_answer(query_text, channel_id, scope, target_client, user_email, respond, settled, respond_lock):
+    """Run the /ask Assistant query and chat fallback and pick the answer
+    
+    Returns:
+        tuple: (answer or None, message explaining why the fallback couldn't run, or None)
+    """
+    # ENHANCEMENT: If query mentions email/mailbox, enhance the query to trigger file_search
+    enhanced_query = query_text
+    is_email_query = bool(_EMAIL_KEYWORDS_RE.search(query_text))
+    
+    # Check for recency keywords
+    wants_recent = bool(_RECENCY_KEYWORDS_RE.search(query_text))
+    
+    if wants_recent:
+        # Add strong instruction to check dates
+        enhanced_query = (
+            f"{query_text}\n\n"
+            f"CRITICAL: The user is asking about the MOST RECENT information. "
+            f"You MUST look at the dates/timestamps in the results. "
+            f"Messages in the logs show dates like '2025-12-10 18:57 (3 hours ago)'. "
+            f"Return ONLY the content with the NEWEST date - ignore older entries. "
+            f"If you find multiple results, compare the dates and return the one from the most recent date."
+        )
+    elif is_email_query:
+        # Add explicit instruction to search emails
+        enhanced_query = (
+            f"{query_text}\n\n"
+            f"IMPORTANT: If this question is about emails or communications, "
+            f"you MUST use the file_search tool to search the 'Slack Logs' file. "
+            f"Look for entries marked as 'Source: MAILBOX_INBOX (Email)' and return the full email content."
+        )
+    
+    # Prepare the "Simple" JSON Chat fallback up front, so it can run alongside the Assistant
+    fallback_prompt, fallback_error = None, None
+    
+    # Load Data (read-only; the serialized context is shared with the mention path per scope/client)
+    projects = load_db(readonly=True)
+
+    # Security & Context Setup
+    if scope == "client" and not target_client:
+        fallback_error = "❌ Error: Client mapping not configured for this channel."
+    elif not ai_client:
+        fallback_error = "⚠️ AI Client not configured."
+    else:
+        # Sanitize for external/merchant: only this client's projects, without internal fields.
+        # Partners see all but limited internal info; internal has full access.
+        data_context = build_data_context(projects, scope, target_client if scope == "client" else None)
+        if data_context is None:
+            fallback_error = "I can only discuss project details related to this channel."
+        else:
+            system_prompt = get_system_prompt(user_email, target_client)
+            # If user asked about emails, the fallback has to admit the Assistant is where those live
+            if is_email_query:
+                # Get fallback message from prompts config
+                fallback_append = app_prompts.get("ask_command", {}).get("email_fallback_prompt", {}).get(
+                    "prompt_append", 
+                    "⚠️ I couldn't find that information in your authorized project data."
                 )
-                return
-        
-        # Get history
-        history = project.get("history", [])
-        
-        if not history:
-            respond(
-                text=f"📋 *{project.get('client')}* - No change history yet.",
-                response_type="ephemeral"
-            )
-            return
-        
-        # Format full history
-        history_text = f"📋 *Full Change History for {project.get('client')}*\n\n"
-        history_text += f"*Total Updates:* {len(history)}\n\n"
-        
-        # Show most recent first
-        for idx, entry in enumerate(reversed(history), 1):
-            timestamp = entry.get("timestamp", "Unknown")
-            user = entry.get("user", "Unknown")
-            changes = entry.get("changes", {})
-            
-            history_text += f"*{idx}. {timestamp}* by `{user}`\n"
-            
-            for field, change in changes.items():
-                field_name = field.replace('_', ' ').title()
-                old_val = change.get('old', '-')
-                new_val = change.get('new', '-')
-                
-                # Truncate long values
-                if len(old_val) > 80:
-                    old_val = old_val[:77] + "..."
-                if len(new_val) > 80:
-                    new_val = new_val[:77] + "..."
-                
-                history_text += f"   • *{field_name}:* `{old_val}` → `{new_val}`\n"
-            
-            history_text += "\n"
-        
-        respond(text=history_text, response_type="ephemeral")
+                fallback_prompt = _PROMPT_WITH_NOTE_TEMPLATE.format(system_prompt=system_prompt, note=fallback_append, data_context=data_context)
+            else:
+                fallback_prompt = _PROMPT_TEMPLATE.format(system_prompt=system_prompt, data_context=data_context)
+
+    # Ask the Knowledge Base (Assistant: Slack messages, history, emails, etc.) and the
+    # fallback at the same time. 60s Assistant timeout for file_search operations.
+    assistant_future = _ASSISTANT_POOL.submit(query_assistant, enhanced_query, channel_id, timeout=60,
+                                              cache_query=query_text)
+    # Email and "latest" answers only exist in the Assistant's logs, so the fallback never
+    # pre-empts it then; otherwise a finished fallback gives the Assistant a short grace period
+    assistant_only = is_email_query or wants_recent
+    fallback_future = None
+    if fallback_prompt:
+        # Partial fallback text only shows once the Assistant has come back empty
+        fallback_future = _ASK_FALLBACK_POOL.submit(
+            _ask_fallback_completion, fallback_prompt, query_text,
+            respond, settled, respond_lock, assistant_future
+        )
+    
+    answer = _first_answer(assistant_future, fallback_future,
+                           grace=None if assistant_only else ASK_ASSISTANT_GRACE_SECONDS,
+                           timeout=ASK_ANSWER_DEADLINE_SECONDS)
+    return answer, fallback_error
 
-    # Start background thread
-    threading.Thread(target=process_history).start()
-# ==========================================
-# FEATURE: ASK COMMAND (THREADED FIX)
-# ==========================================
+# In-flight /ask answers by (audience, normalized question) hash, so concurrent duplicates wait for one
+_INFLIGHT_ASKS = {}
+_INFLIGHT_ASKS_LOCK = threading.Lock()
 
 def process_ask_background(respond, query_text, channel_id, user_id, client):
     """Background worker to handle AI query without blocking Slack"""
+    settled, respond_lock = threading.Event(), threading.Lock()
+    thinking_shown = False
+    
+    def reply_final(text):
+        # Replace Thinking... (or a streamed partial) once one is on screen, and stop further partials
+        with respond_lock:
+            settled.set()
+            respond(text=text, response_type="ephemeral", replace_original=thinking_shown)
+    
     try:
-        # Show thinking message
-        respond(
-            text=f"🧠 *Thinking about: {query_text[:50]}{'...' if len(query_text) > 50 else ''}*",
-            response_type="ephemeral"
-        )
-        
-        # ENHANCEMENT: If query mentions email/mailbox, enhance the query to trigger file_search
-        enhanced_query = query_text
-        query_lower = query_text.lower()
-        
-        # Check for recency keywords
-        recency_keywords = ['latest', 'recent', 'last', 'newest', 'today', 'yesterday', 'this week']
-        wants_recent = any(keyword in query_lower for keyword in recency_keywords)
-        
-        if wants_recent:
-            # Add strong instruction to check dates
-            enhanced_query = (
-                f"{query_text}\n\n"
-                f"CRITICAL: The user is asking about the MOST RECENT information. "
-                f"You MUST look at the dates/timestamps in the results. "
-                f"Messages in the logs show dates like '2025-12-10 18:57 (3 hours ago)'. "
-                f"Return ONLY the content with the NEWEST date - ignore older entries. "
-                f"If you find multiple results, compare the dates and return the one from the most recent date."
-            )
-        elif any(keyword in query_lower for keyword in ['email', 'mailbox', 'mail', 'message', 'communication', 'said', 'wrote']):
-            # Add explicit instruction to search emails
-            enhanced_query = (
-                f"{query_text}\n\n"
-                f"IMPORTANT: If this question is about emails or communications, "
-                f"you MUST use the file_search tool to search the 'Slack Logs' file. "
-                f"Look for entries marked as 'Source: MAILBOX_INBOX (Email)' and return the full email content."
-            )
-        
-        # 1. Try to get answer from the Knowledge Base (Assistant) FIRST
-        # This checks the Vector Store (Slack messages, history, emails, etc.)
-        # Increased timeout to 60s for file_search operations
-        assistant_response = query_assistant(enhanced_query, channel_id, timeout=60)
-        
-        if assistant_response:
-            # If the Assistant found something (e.g. Slack logs, emails), return it!
-            respond(text=assistant_response, response_type="ephemeral")
-            return
-
-        # =================================================================
-        # FALLBACK: If Assistant fails or is empty, use the "Simple" JSON Chat
-        # =================================================================
-        
-        # Load Data
-        projects = load_db()
+        # Who is asking decides which data an answer may contain (and which cached answers fit)
         context = get_request_context(channel_id)
         channel_role = context.get('role', 'internal')
         target_client = context.get('client')
@@ -1845,87 +3214,74 @@ def process_ask_background(respond, query_text, channel_id, user_id, client):
         # If user is a merchant, get their client
         if user_role == "merchant" and not target_client:
             target_client = get_merchant_client(user_email)
-
-        # Security & Context Setup
-        if channel_role == 'external' or user_role == 'merchant':
-            if not target_client:
-                respond(text="❌ Error: Client mapping not configured for this channel.", response_type="ephemeral")
-                return
-            projects = [p for p in projects if p.get('client', '').lower() == target_client.lower()]
-            if not projects:
-                respond(text="I can only discuss project details related to this channel.", response_type="ephemeral")
-                return
-            
-            # Sanitize for external/merchant
-            safe_projects = []
-            for p in projects:
-                safe_p = {k: v for k, v in p.items() if k not in ['internal_notes', 'budget']}
-                safe_projects.append(safe_p)
-            
-            system_prompt = get_system_prompt(user_email, target_client)
-            data_context = json.dumps(safe_projects, indent=2)
         
+        if channel_role == 'external' or user_role == 'merchant':
+            scope = "client"
         elif user_role == 'partner':
-            # Partners see all but limited internal info
-            safe_projects = []
-            for p in projects:
-                safe_p = {k: v for k, v in p.items() if k not in ['internal_notes', 'budget']}
-                safe_projects.append(safe_p)
-            
-            system_prompt = get_system_prompt(user_email, target_client)
-            data_context = json.dumps(safe_projects, indent=2)
-        
+            scope = "partner"
         else:
-            # Internal - full access
-            system_prompt = get_system_prompt(user_email, target_client)
-            data_context = json.dumps(projects, indent=2)
-
-        if not ai_client:
-            respond(text="⚠️ AI Client not configured.", response_type="ephemeral")
+            scope = "internal"
+        cache_namespace = ("ask", scope, (target_client or "").lower() if scope == "client" else "")
+        
+        # A previous answer to the same (or a paraphrased) question skips both AI calls
+        cache_generation = _assistant_cache.generation
+        cached = _assistant_cache.get(cache_namespace, query_text)
+        if cached:
+            respond(text=cached, response_type="ephemeral")
             return
-
-        # FALLBACK: If user asked about emails but Assistant didn't find them
-        if any(keyword in query_lower for keyword in ['email', 'mailbox', 'mail', 'message']):
-            # Get fallback message from prompts config
-            fallback_append = app_prompts.get("ask_command", {}).get("email_fallback_prompt", {}).get(
-                "prompt_append", 
-                "⚠️ I couldn't find that information in your authorized project data."
-            )
-            fallback_prompt = f"{system_prompt}\n\n{fallback_append}\n\nPROJECT DATA:\n{data_context}"
-        else:
-            fallback_prompt = f"{system_prompt}\n\nPROJECT DATA:\n{data_context}"
-
-        # AI Call (The "Dumb" Fallback)
-        response = ai_client.chat.completions.create(
-            model=OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": fallback_prompt},
-                {"role": "user", "content": query_text}
-            ],
-            timeout=20 
+        
+        # Show thinking message
+        respond(
+            text=f"🧠 *Thinking about: {query_text[:50]}{'...' if len(query_text) > 50 else ''}*",
+            response_type="ephemeral"
         )
+        thinking_shown = True
+        
+        # Identical questions already being answered for the same audience share that answer
+        flight_key = hashlib.sha256(repr(SemanticCache._exact_key(cache_namespace, query_text)).encode()).hexdigest()
+        with _INFLIGHT_ASKS_LOCK:
+            flight = _INFLIGHT_ASKS.get(flight_key)
+            leader = flight is None
+            if leader:
+                flight = _INFLIGHT_ASKS[flight_key] = Future()
+        
+        if leader:
+            try:
+                answer, fallback_error = _compute_ask_answer(
+                    query_text, channel_id, scope, target_client, user_email, respond, settled, respond_lock
+                )
+                flight.set_result((answer, fallback_error))
+            except Exception as e:
+                flight.set_exception(e)
+                raise
+            finally:
+                with _INFLIGHT_ASKS_LOCK:
+                    _INFLIGHT_ASKS.pop(flight_key, None)
+        else:
+            print("♻️ Joining an identical /ask already in flight")
+            answer, fallback_error = flight.result(timeout=90)
         
-        # Send Final Answer
-        respond(text=response.choices[0].message.content, response_type="ephemeral")
+        if not answer:
+            reply_final(fallback_error or "⚠️ I couldn't find an answer to that.")
+            return
+        
+        # Send Final Answer (replacing Thinking... or the partial answer)
+        reply_final(answer)
+        if leader:
+            _assistant_cache.put(cache_namespace, query_text, answer, generation=cache_generation)
         
     except Exception as e:
         error_msg = str(e)
-        print(f"❌ Error in /ask background worker: {error_msg}")
+        logger.exception("❌ Error in /ask background worker")
         
         if "timeout" in error_msg.lower():
-            respond(
-                text="⏱️ The AI request timed out. Please try a simpler question.",
-                response_type="ephemeral"
-            )
+            reply_final("⏱️ The AI request timed out. Please try a simpler question.")
         else:
-            respond(
-                text=f"❌ Error processing your question: {error_msg[:200]}",
-                response_type="ephemeral"
-            )
+            reply_final(f"❌ Error processing your question: {error_msg[:200]}")
 
 @app.command("/ask")
 def command_ask(ack, respond, command, body, client):
-    """Handle /ask command - Uses Threading to prevent Timeout"""
+    """Handle /ask command - Runs on the AI worker pool to prevent Timeout"""
     # 1. Acknowledge Slack immediately (Must happen < 3 seconds)
     ack()
     
@@ -1949,13 +3305,9 @@ def command_ask(ack, respond, command, body, client):
         respond(text="Please provide a question. Example: `/ask What projects are stuck?`", response_type="ephemeral")
         return
     
-    # 3. Start Background Thread
+    # 3. Hand off to the AI worker pool (bounded, threads are reused across requests)
     # We pass 'respond' because it contains the response_url which works for 30 minutes
-    worker_thread = threading.Thread(
-        target=process_ask_background,
-        args=(respond, query_text, channel_id, user_id, client)
-    )
-    worker_thread.start()
+    _AI_EXECUTOR.submit(process_ask_background, respond, query_text, channel_id, user_id, client)
 
 # ==========================================
 # STANDARD MODAL LOGIC (Add/Edit/Update)
@@ -1990,7 +3342,7 @@ def action_update_project(ack, body, client):
 @require_authorization(internal_only=True)
 def command_update_project(ack, body, client):
     ack()
-    projects = load_db()
+    projects = load_db(readonly=True)
     if not projects:
         client.chat_postEphemeral(
             channel=body["channel_id"],
@@ -2015,7 +3367,7 @@ def command_add_client(ack, body, client):
 def handle_add_submission(ack, view, body, client):
     ack()
     try:
-        name = view["state"]["values"].get("new_client_name", {}).get("input", {}).get("value", "").strip()
+        name = (_dig(view["state"]["values"], "new_client_name", "input", "value") or "").strip()
         
         if not name:
             ack(response_action="errors", errors={"new_client_name": "Client name cannot be empty"})
@@ -2024,7 +3376,7 @@ def handle_add_submission(ack, view, body, client):
         projects = load_db()
         
         # Check for duplicate client names
-        if any(p.get("client", "").lower() == name.lower() for p in projects):
+        if find_project(projects, name):
             ack(response_action="errors", errors={"new_client_name": "A client with this name already exists"})
             return
         
@@ -2033,20 +3385,47 @@ def handle_add_submission(ack, view, body, client):
             "category": "New / In Progress", "status": "Initialized", 
             "blocker": "-", "last_updated": datetime.now().strftime("%Y-%m-%d")
         })
-        save_db(projects)
-    except (KeyError, TypeError) as e:
-        print(f"❌ Error adding client: {e}")
+        user_id = (body.get("user") or {}).get("id")
+        on_save_done(save_db(projects), f"new client '{name}'",
+                     on_failure=lambda: _notify_save_failed(client, user_id, f"the new client *{name}*"))
+    except (KeyError, TypeError):
+        logger.exception("❌ Error adding client")
         ack(response_action="errors", errors={"new_client_name": "Error processing request"})
-    except Exception as e:
-        print(f"❌ Unexpected error adding client: {e}")
+    except Exception:
+        logger.exception("❌ Unexpected error adding client")
         ack(response_action="errors", errors={"new_client_name": "Unexpected error occurred"})
 
 # ==========================================
 # FEATURE: EDIT CLIENT
 # ==========================================
+# Sorted client picker options for the last project list seen (Slack caps static_select at 100)
+_CLIENT_OPTIONS = {"source": None, "options": []}
+_SELECT_MAX_OPTIONS = 100
+
+def _client_options(projects):
+    """static_select options for every client, sorted by name (treat as read-only)
+    
+    Memoized on the projects list, so readonly loads only rebuild them when the data changes.
+    """
+    with _PROJECT_INDEX_LOCK:
+        if _CLIENT_OPTIONS["source"] is projects:
+            return _CLIENT_OPTIONS["options"]
+    
+    names = sorted(p["client"] for p in projects)
+    options = [
+        {"text": {"type": "plain_text", "text": name[:75]}, "value": name}
+        for name in itertools.islice(names, _SELECT_MAX_OPTIONS)
+    ]
+    if not _is_shared_parse(projects):
+        return options
+    with _PROJECT_INDEX_LOCK:
+        _CLIENT_OPTIONS["source"] = projects
+        _CLIENT_OPTIONS["options"] = options
+    return options
+
 def launch_edit_client_modal(client, trigger_id):
     """Opens a modal to edit/rename a client"""
-    projects = load_db()
+    projects = load_db(readonly=True)
     if not projects:
         client.views_open(
             trigger_id=trigger_id,
@@ -2058,8 +3437,7 @@ def launch_edit_client_modal(client, trigger_id):
         )
         return
 
-    client_names = sorted([p["client"] for p in projects])
-    options = [{"text": {"type": "plain_text", "text": name[:75]}, "value": name} for name in client_names][:100]
+    options = _client_options(projects)
 
     client.views_open(
         trigger_id=trigger_id,
@@ -2094,7 +3472,7 @@ def launch_edit_client_modal(client, trigger_id):
 @require_authorization(internal_only=True)
 def command_edit_client(ack, body, client):
     ack()
-    projects = load_db()
+    projects = load_db(readonly=True)
     if not projects:
         client.chat_postEphemeral(
             channel=body["channel_id"],
@@ -2107,161 +3485,192 @@ def command_edit_client(ack, body, client):
 # ==========================================
 # FEATURE: ADMIN COMMAND
 # ==========================================
+# Static parts of the admin modal, built once (Slack only reads them; never mutate)
+_DIVIDER_BLOCK = {"type": "divider"}
+_ADD_REMOVE_OPTIONS = [
+    {"text": {"type": "plain_text", "text": "Add User"}, "value": "add"},
+    {"text": {"type": "plain_text", "text": "Remove User"}, "value": "remove"}
+]
+_ADD_CHANNEL_OPTIONS = [
+    {"text": {"type": "plain_text", "text": "Add Channel"}, "value": "add"}
+]
+_ROLE_OPTIONS = [
+    {"text": {"type": "plain_text", "text": "Internal"}, "value": "internal"},
+    {"text": {"type": "plain_text", "text": "External"}, "value": "external"}
+]
+_ADMIN_HEADER_BLOCKS = (
+    {
+        "type": "header",
+        "text": {"type": "plain_text", "text": "Configuration Management"}
+    },
+    _DIVIDER_BLOCK,
+)
+_ADMIN_INTERNAL_INPUTS = (
+    {
+        "type": "input",
+        "block_id": "internal_users_action",
+        "label": {"type": "plain_text", "text": "Action"},
+        "element": {
+            "type": "static_select",
+            "action_id": "internal_action",
+            "options": _ADD_REMOVE_OPTIONS,
+            "placeholder": {"type": "plain_text", "text": "Select action..."}
+        }
+    },
+    {
+        "type": "input",
+        "block_id": "internal_user_email",
+        "label": {"type": "plain_text", "text": "Email Address"},
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "email",
+            "placeholder": {"type": "plain_text", "text": "user@example.com"}
+        },
+        "optional": True
+    },
+)
+_ADMIN_EXTERNAL_INPUTS = (
+    {
+        "type": "input",
+        "block_id": "external_users_action",
+        "label": {"type": "plain_text", "text": "Action"},
+        "element": {
+            "type": "static_select",
+            "action_id": "external_action",
+            "options": _ADD_REMOVE_OPTIONS,
+            "placeholder": {"type": "plain_text", "text": "Select action..."}
+        }
+    },
+    {
+        "type": "input",
+        "block_id": "external_user_email",
+        "label": {"type": "plain_text", "text": "Email Address"},
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "email",
+            "placeholder": {"type": "plain_text", "text": "user@example.com"}
+        },
+        "optional": True
+    },
+)
+_ADMIN_CHANNEL_INPUTS = (
+    {
+        "type": "input",
+        "block_id": "channel_action",
+        "label": {"type": "plain_text", "text": "Action"},
+        "element": {
+            "type": "static_select",
+            "action_id": "channel_action_select",
+            "options": _ADD_CHANNEL_OPTIONS,
+            "placeholder": {"type": "plain_text", "text": "Select action..."}
+        }
+    },
+    {
+        "type": "input",
+        "block_id": "channel_id_input",
+        "label": {"type": "plain_text", "text": "Channel ID"},
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "channel_id",
+            "placeholder": {"type": "plain_text", "text": "C09XXXXXX"}
+        },
+        "optional": True
+    },
+    {
+        "type": "input",
+        "block_id": "channel_client",
+        "label": {"type": "plain_text", "text": "Client Name"},
+        "element": {
+            "type": "plain_text_input",
+            "action_id": "client_name",
+            "placeholder": {"type": "plain_text", "text": "Client Name"}
+        },
+        "optional": True
+    },
+    {
+        "type": "input",
+        "block_id": "channel_role",
+        "label": {"type": "plain_text", "text": "Role"},
+        "element": {
+            "type": "static_select",
+            "action_id": "role_select",
+            "options": _ROLE_OPTIONS,
+            "placeholder": {"type": "plain_text", "text": "Select role..."}
+        },
+        "optional": True
+    },
+)
+
+_ADMIN_LOADING_TEXT = "_Loading…_"
+
+def _admin_view(internal_list, external_list, channel_list):
+    """The admin modal around the three (pre-formatted) list sections"""
+    return {
+        "type": "modal",
+        "callback_id": "admin_main",
+        "title": {"type": "plain_text", "text": "🔐 Admin Panel"},
+        "submit": {"type": "plain_text", "text": "Save Changes"},
+        "close": {"type": "plain_text", "text": "Cancel"},
+        "blocks": [
+            *_ADMIN_HEADER_BLOCKS,
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": "*1. Internal Users* (authorized_users)\n" + internal_list}
+            },
+            *_ADMIN_INTERNAL_INPUTS,
+            _DIVIDER_BLOCK,
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": "*2. External Users* (external_authorized_users)\n" + external_list}
+            },
+            *_ADMIN_EXTERNAL_INPUTS,
+            _DIVIDER_BLOCK,
+            {
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": f"*3. Channel Mapping*\n{channel_list}\n\n_Showing first 10 channels_"}
+            },
+            *_ADMIN_CHANNEL_INPUTS,
+        ]
+    }
+
+def _populate_admin_view(client, view_id, view_hash):
+    """Fill the opened admin modal's lists in from the current config"""
+    try:
+        config = load_config()
+        internal_users = config.get("authorized_users", [])
+        external_users = config.get("external_authorized_users", [])
+        channel_map = config.get("channel_map", {})
+        
+        # Format current users for display
+        internal_list = "\n".join(f"• {email}" for email in itertools.islice(internal_users, 20)) or "• (none)"
+        external_list = "\n".join(f"• {email}" for email in itertools.islice(external_users, 20)) or "• (none)"
+        
+        # Format current channels for display
+        channel_list = "\n".join(
+            f"• {channel_id[:12]}... → {info.get('client', 'N/A')} ({info.get('role', 'N/A')})"
+            for channel_id, info in itertools.islice(channel_map.items(), 10)
+        ) or "• (none)"
+        
+        # hash makes Slack drop this update if the view changed in the meantime
+        client.views_update(view_id=view_id, hash=view_hash,
+                            view=_admin_view(internal_list, external_list, channel_list))
+    except Exception:
+        logger.exception("❌ Error populating admin modal")
+
+# The opening (placeholder) view never changes, so it is built once (the SDK serializes
+# a dict view itself, so a pre-encoded string would only be encoded again)
+_ADMIN_SKELETON_VIEW = _admin_view(_ADMIN_LOADING_TEXT, _ADMIN_LOADING_TEXT, _ADMIN_LOADING_TEXT)
+
 def launch_admin_modal(client, trigger_id):
-    """Launch admin modal for managing configuration"""
-    # Load current config
-    config = load_config()
-    internal_users = config.get("authorized_users", [])
-    external_users = config.get("external_authorized_users", [])
-    channel_map = config.get("channel_map", {})
-    
-    # Format current users for display
-    internal_list = "\n".join([f"• {email}" for email in internal_users[:20]]) or "• (none)"
-    external_list = "\n".join([f"• {email}" for email in external_users[:20]]) or "• (none)"
+    """Launch admin modal for managing configuration
     
-    # Format current channels for display
-    channel_list = "\n".join([
-        f"• {channel_id[:12]}... → {info.get('client', 'N/A')} ({info.get('role', 'N/A')})"
-        for channel_id, info in list(channel_map.items())[:10]
-    ]) or "• (none)"
-    
-    client.views_open(
-        trigger_id=trigger_id,
-        view={
-            "type": "modal",
-            "callback_id": "admin_main",
-            "title": {"type": "plain_text", "text": "🔐 Admin Panel"},
-            "submit": {"type": "plain_text", "text": "Save Changes"},
-            "close": {"type": "plain_text", "text": "Cancel"},
-            "blocks": [
-                {
-                    "type": "header",
-                    "text": {"type": "plain_text", "text": "Configuration Management"}
-                },
-                {
-                    "type": "divider"
-                },
-                {
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": "*1. Internal Users* (authorized_users)\n" + internal_list}
-                },
-                {
-                    "type": "input",
-                    "block_id": "internal_users_action",
-                    "label": {"type": "plain_text", "text": "Action"},
-                    "element": {
-                        "type": "static_select",
-                        "action_id": "internal_action",
-                        "options": [
-                            {"text": {"type": "plain_text", "text": "Add User"}, "value": "add"},
-                            {"text": {"type": "plain_text", "text": "Remove User"}, "value": "remove"}
-                        ],
-                        "placeholder": {"type": "plain_text", "text": "Select action..."}
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "internal_user_email",
-                    "label": {"type": "plain_text", "text": "Email Address"},
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "email",
-                        "placeholder": {"type": "plain_text", "text": "user@example.com"}
-                    },
-                    "optional": True
-                },
-                {
-                    "type": "divider"
-                },
-                {
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": "*2. External Users* (external_authorized_users)\n" + external_list}
-                },
-                {
-                    "type": "input",
-                    "block_id": "external_users_action",
-                    "label": {"type": "plain_text", "text": "Action"},
-                    "element": {
-                        "type": "static_select",
-                        "action_id": "external_action",
-                        "options": [
-                            {"text": {"type": "plain_text", "text": "Add User"}, "value": "add"},
-                            {"text": {"type": "plain_text", "text": "Remove User"}, "value": "remove"}
-                        ],
-                        "placeholder": {"type": "plain_text", "text": "Select action..."}
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "external_user_email",
-                    "label": {"type": "plain_text", "text": "Email Address"},
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "email",
-                        "placeholder": {"type": "plain_text", "text": "user@example.com"}
-                    },
-                    "optional": True
-                },
-                {
-                    "type": "divider"
-                },
-                {
-                    "type": "section",
-                    "text": {"type": "mrkdwn", "text": f"*3. Channel Mapping*\n{channel_list}\n\n_Showing first 10 channels_"}
-                },
-                {
-                    "type": "input",
-                    "block_id": "channel_action",
-                    "label": {"type": "plain_text", "text": "Action"},
-                    "element": {
-                        "type": "static_select",
-                        "action_id": "channel_action_select",
-                        "options": [
-                            {"text": {"type": "plain_text", "text": "Add Channel"}, "value": "add"}
-                        ],
-                        "placeholder": {"type": "plain_text", "text": "Select action..."}
-                    }
-                },
-                {
-                    "type": "input",
-                    "block_id": "channel_id_input",
-                    "label": {"type": "plain_text", "text": "Channel ID"},
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "channel_id",
-                        "placeholder": {"type": "plain_text", "text": "C09XXXXXX"}
-                    },
-                    "optional": True
-                },
-                {
-                    "type": "input",
-                    "block_id": "channel_client",
-                    "label": {"type": "plain_text", "text": "Client Name"},
-                    "element": {
-                        "type": "plain_text_input",
-                        "action_id": "client_name",
-                        "placeholder": {"type": "plain_text", "text": "Client Name"}
-                    },
-                    "optional": True
-                },
-                {
-                    "type": "input",
-                    "block_id": "channel_role",
-                    "label": {"type": "plain_text", "text": "Role"},
-                    "element": {
-                        "type": "static_select",
-                        "action_id": "role_select",
-                        "options": [
-                            {"text": {"type": "plain_text", "text": "Internal"}, "value": "internal"},
-                            {"text": {"type": "plain_text", "text": "External"}, "value": "external"}
-                        ],
-                        "placeholder": {"type": "plain_text", "text": "Select role..."}
-                    },
-                    "optional": True
-                }
-            ]
-        }
-    )
+    Opens with placeholder lists so the trigger_id is used right away; the lists are
+    filled in by a views_update from a background thread.
+    """
+    resp = client.views_open(trigger_id=trigger_id, view=_ADMIN_SKELETON_VIEW)
+    view = resp["view"]
+    threading.Thread(target=_populate_admin_view, args=(client, view["id"], view.get("hash")),
+                     daemon=True, name="admin-view").start()
 
 @app.command("/admin")
 @require_authorization(internal_only=True)
@@ -2279,6 +3688,78 @@ def command_superadmin(ack, body, client):
     # This provides two command aliases for the same functionality
     launch_admin_modal(client, body["trigger_id"])
 
+def _dig(d, *keys, default=None):
+    """Walk nested dicts (e.g. view state values) without building {} fallbacks
+    
+    Returns:
+        The value at the end of the key path, or default if any step is missing/None
+    """
+    for key in keys:
+        d = d.get(key) if isinstance(d, dict) else None
+        if d is None:
+            return default
+    return d
+
+def _apply_email_list_action(config, key, action, email, label, messages):
+    """Add or remove a (lowercased) email in one of the config's user lists
+    
+    Membership is checked case-insensitively against a set of the stored emails, built
+    once per submission; removal drops every casing of the address in a single pass.
+    
+    Returns:
+        bool: True if the list changed
+    """
+    users = config.get(key, [])
+    present = email in {u.lower() for u in users}
+    
+    if action == "add":
+        if present:
+            messages.append(f"⚠️ {email} already in {label}")
+            return False
+        users.append(email)
+        config[key] = users
+        messages.append(f"✅ Added {email} to {label}")
+        return True
+    if action == "remove":
+        if not present:
+            messages.append(f"⚠️ {email} not found in {label}")
+            return False
+        config[key] = [u for u in users if u.lower() != email]
+        messages.append(f"✅ Removed {email} from {label}")
+        return True
+    return False
+
+# Appended to the admin reply after a successful save
+_CONFIG_SAVED_NOTICE = (
+    "\n✅ Configuration saved successfully to config.json!\n"
+    "⚠️ *Important:* If you're using `CONFIG_JSON` environment variable in Render/deployment:\n"
+    "   1. Copy the updated config.json content\n"
+    "   2. Update the `CONFIG_JSON` environment variable in your deployment platform\n"
+    "   3. Restart the service for changes to take effect"
+)
+
+def _config_digest(config):
+    """Content hash of a config, to tell whether a submission really changed it
+    
+    Key order is stable for a dict edited in place (the only new keys are real changes),
+    so the compact serialization doesn't need sorting.
+    """
+    return hashlib.blake2b(_json_dumpb(config, pretty=False), digest_size=16).digest()
+
+def _post_admin_reply(client, body, text):
+    """Tell the admin how their submission went (ephemeral in the channel, else a DM)"""
+    user_id = body["user"]["id"]
+    channel_id = body.get("container", {}).get("channel_id") or body.get("channel_id")
+    
+    if channel_id:
+        client.chat_postEphemeral(channel=channel_id, user=user_id, text=text)
+    else:
+        # Fallback: try to send DM
+        try:
+            client.chat_postMessage(channel=user_id, text=text)
+        except:
+            print(f"Admin update: {text}")
+
 @app.view("admin_main")
 def handle_admin_submission(ack, body, view, client):
     """Handle admin modal submission"""
@@ -2287,111 +3768,58 @@ def handle_admin_submission(ack, body, view, client):
     try:
         values = view["state"]["values"]
         config = load_config()
+        before = _config_digest(config)
         updated = False
         messages = []
         
         # 1. Handle Internal Users
-        internal_action = values.get("internal_users_action", {}).get("internal_action", {}).get("selected_option", {}).get("value")
-        internal_email = values.get("internal_user_email", {}).get("email", {}).get("value", "").strip().lower()
+        internal_action = _dig(values, "internal_users_action", "internal_action", "selected_option", "value")
+        internal_email = (_dig(values, "internal_user_email", "email", "value") or "").strip().lower()
         
         if internal_action and internal_email:
-            authorized_users = config.get("authorized_users", [])
-            authorized_users_lower = [email.lower() for email in authorized_users]
-            
-            if internal_action == "add":
-                if internal_email not in authorized_users_lower:
-                    authorized_users.append(internal_email)
-                    config["authorized_users"] = authorized_users
-                    updated = True
-                    messages.append(f"✅ Added {internal_email} to internal users")
-                else:
-                    messages.append(f"⚠️ {internal_email} already in internal users")
-            elif internal_action == "remove":
-                if internal_email in authorized_users_lower:
-                    authorized_users = [email for email in authorized_users if email.lower() != internal_email]
-                    config["authorized_users"] = authorized_users
-                    updated = True
-                    messages.append(f"✅ Removed {internal_email} from internal users")
-                else:
-                    messages.append(f"⚠️ {internal_email} not found in internal users")
+            if _apply_email_list_action(config, "authorized_users", internal_action, internal_email, "internal users", messages):
+                updated = True
         
         # 2. Handle External Users
-        external_action = values.get("external_users_action", {}).get("external_action", {}).get("selected_option", {}).get("value")
-        external_email = values.get("external_user_email", {}).get("email", {}).get("value", "").strip().lower()
+        external_action = _dig(values, "external_users_action", "external_action", "selected_option", "value")
+        external_email = (_dig(values, "external_user_email", "email", "value") or "").strip().lower()
         
         if external_action and external_email:
-            external_authorized_users = config.get("external_authorized_users", [])
-            external_authorized_users_lower = [email.lower() for email in external_authorized_users]
-            
-            if external_action == "add":
-                if external_email not in external_authorized_users_lower:
-                    external_authorized_users.append(external_email)
-                    config["external_authorized_users"] = external_authorized_users
-                    updated = True
-                    messages.append(f"✅ Added {external_email} to external users")
-                else:
-                    messages.append(f"⚠️ {external_email} already in external users")
-            elif external_action == "remove":
-                if external_email in external_authorized_users_lower:
-                    external_authorized_users = [email for email in external_authorized_users if email.lower() != external_email]
-                    config["external_authorized_users"] = external_authorized_users
-                    updated = True
-                    messages.append(f"✅ Removed {external_email} from external users")
-                else:
-                    messages.append(f"⚠️ {external_email} not found in external users")
+            if _apply_email_list_action(config, "external_authorized_users", external_action, external_email, "external users", messages):
+                updated = True
         
         # 3. Handle Channel Mapping
-        channel_action = values.get("channel_action", {}).get("channel_action_select", {}).get("selected_option", {}).get("value")
-        channel_id = values.get("channel_id_input", {}).get("channel_id", {}).get("value", "").strip()
-        client_name = values.get("channel_client", {}).get("client_name", {}).get("value", "").strip()
-        role = values.get("channel_role", {}).get("role_select", {}).get("selected_option", {}).get("value")
+        channel_action = _dig(values, "channel_action", "channel_action_select", "selected_option", "value")
+        channel_id = (_dig(values, "channel_id_input", "channel_id", "value") or "").strip()
+        client_name = (_dig(values, "channel_client", "client_name", "value") or "").strip()
+        role = _dig(values, "channel_role", "role_select", "selected_option", "value")
         
         if channel_action == "add" and channel_id and client_name and role:
             channel_map = config.get("channel_map", {})
-            channel_map[channel_id] = {"client": client_name, "role": role}
-            config["channel_map"] = channel_map
-            updated = True
-            messages.append(f"✅ Added channel {channel_id[:12]}... for {client_name} ({role})")
-        
-        # Save config if updated
-        if updated:
-            if save_config(config):
-                messages.append("\n✅ Configuration saved successfully to config.json!")
-                messages.append("⚠️ *Important:* If you're using `CONFIG_JSON` environment variable in Render/deployment:")
-                messages.append("   1. Copy the updated config.json content")
-                messages.append("   2. Update the `CONFIG_JSON` environment variable in your deployment platform")
-                messages.append("   3. Restart the service for changes to take effect")
-                # Reload config to update in-memory variables
-                reload_config()
+            entry = {"client": client_name, "role": role}
+            if channel_map.get(channel_id) == entry:
+                messages.append(f"⚠️ Channel {channel_id[:12]}... already mapped to {client_name} ({role})")
             else:
-                messages.append("\n❌ Error saving configuration. Check server logs.")
+                channel_map[channel_id] = entry
+                config["channel_map"] = channel_map
+                updated = True
+                messages.append(f"✅ Added channel {channel_id[:12]}... for {client_name} ({role})")
+        
+        # Save config only if its content really changed (skips the fsync on no-op resubmits)
+        if updated and _config_digest(config) != before:
+            # The write is queued, so a disk failure is reported when it happens
+            save_config(config, background=True, on_failure=lambda: _post_admin_reply(
+                client, body, "❌ Error saving configuration to config.json. The change is live "
+                "but will be lost on restart. Check server logs."))
+            messages.append(_CONFIG_SAVED_NOTICE)
         else:
             messages.append("\n⚠️ No changes made.")
         
         # Send response
-        user_id = body["user"]["id"]
-        channel_id = body.get("container", {}).get("channel_id") or body.get("channel_id")
-        
-        if channel_id:
-            client.chat_postEphemeral(
-                channel=channel_id,
-                user=user_id,
-                text="\n".join(messages) if messages else "No changes made."
-            )
-        else:
-            # Fallback: try to send DM
-            try:
-                client.chat_postMessage(
-                    channel=user_id,
-                    text="\n".join(messages) if messages else "No changes made."
-                )
-            except:
-                print(f"Admin update: {'; '.join(messages)}")
+        _post_admin_reply(client, body, "\n".join(messages) if messages else "No changes made.")
     
     except Exception as e:
-        print(f"❌ Error in admin submission: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("❌ Error in admin submission")
         try:
             user_id = body["user"]["id"]
             channel_id = body.get("container", {}).get("channel_id") or body.get("channel_id")
@@ -2414,25 +3842,33 @@ def command_sync_knowledge(ack, client, body):
     # Check if user wants to sync messages
     sync_messages = 'messages' in command_text or 'full' in command_text
     
-    client.chat_postMessage(channel=channel_id, text="🔄 *Syncing Knowledge Base...*")
+    # One status message, edited in place as the sync progresses
+    status = client.chat_postMessage(
+        channel=channel_id,
+        text="📥 Fetching emails and chats (this takes 10s)..." if sync_messages else "🔄 *Syncing Knowledge Base...*"
+    )
+    
+    def post_status(text):
+        try:
+            client.chat_update(channel=channel_id, ts=status["ts"], text=text)
+        except Exception as e:
+            print(f"⚠️ Could not update sync status message: {e}")
+            client.chat_postMessage(channel=channel_id, text=text)
     
     try:
-        # 1. Always sync projects.json (Structured Data)
-        sync_all_data_to_openai()
+        # A single pass uploads projects.json (Structured Data) and the Slack/Email logs
+        result_msg = sync_all_data_to_openai()
         msg = "✅ `projects.json` (Structured Data) updated.\n"
         
-        # 2. Sync Slack/Email Logs (Unstructured Data)
         if sync_messages:
-            client.chat_postMessage(channel=channel_id, text="📥 Fetching emails and chats (this takes 10s)...")
-            result_msg = sync_all_data_to_openai()
             msg += result_msg
         else:
             msg += "ℹ️ _Skipped message logs. Use `/sync-knowledge messages` to include emails/chats._"
             
-        client.chat_postMessage(channel=channel_id, text=msg)
+        post_status(msg)
         
     except Exception as e:
-        client.chat_postMessage(channel=channel_id, text=f"❌ Error: {e}")
+        post_status(f"❌ Error: {e}")
 
 @app.command("/diagnose")
 @require_authorization(internal_only=True)
@@ -2464,12 +3900,12 @@ def command_diagnose(ack, client, body):
             try:
                 asst = ai_client.beta.assistants.retrieve(ASSISTANT_ID)
                 status_msg += f"• Assistant Retrieval: ✅ Found '{asst.name}'\n"
-                
+            
                 # Check Vector Store Attachment
                 vs_ids = []
                 if asst.tool_resources and asst.tool_resources.file_search:
                     vs_ids = asst.tool_resources.file_search.vector_store_ids or []
-                
+            
                 if VECTOR_STORE_ID and VECTOR_STORE_ID in vs_ids:
                     status_msg += f"• Vector Store Attachment: ✅ Attached\n"
                 else:
@@ -2494,8 +3930,8 @@ def handle_edit_client_submission(ack, body, view, client):
     ack()
     try:
         values = view["state"]["values"]
-        old_name = values.get("select_client_block", {}).get("select_action", {}).get("selected_option", {}).get("value", "")
-        new_name = values.get("new_name_block", {}).get("input", {}).get("value", "").strip()
+        old_name = _dig(values, "select_client_block", "select_action", "selected_option", "value", default="")
+        new_name = (_dig(values, "new_name_block", "input", "value") or "").strip()
 
         if not old_name or not new_name:
             ack(response_action="errors", errors={"new_name_block": "Both client selection and new name are required"})
@@ -2508,32 +3944,29 @@ def handle_edit_client_submission(ack, body, view, client):
         projects = load_db()
         
         # Check if new name already exists
-        if any(p.get("client", "").lower() == new_name.lower() for p in projects):
+        if find_project(projects, new_name):
             ack(response_action="errors", errors={"new_name_block": "A client with this name already exists"})
             return
 
-        updated = False
-        for p in projects:
-            if p["client"] == old_name:
-                p["client"] = new_name
-                updated = True
-                break
-        
-        if updated:
-            save_db(projects)
+        project = find_project(projects, old_name)
+        if project:
+            project["client"] = new_name
+            user_id = (body.get("user") or {}).get("id")
+            on_save_done(save_db(projects), f"rename '{old_name}' -> '{new_name}'",
+                         on_failure=lambda: _notify_save_failed(client, user_id, f"the rename of *{old_name}* to *{new_name}*"))
         else:
             ack(response_action="errors", errors={"select_client_block": "Client not found"})
-    except (KeyError, TypeError) as e:
-        print(f"❌ Error editing client: {e}")
+    except (KeyError, TypeError):
+        logger.exception("❌ Error editing client")
         ack(response_action="errors", errors={"new_name_block": "Error processing request"})
-    except Exception as e:
-        print(f"❌ Unexpected error editing client: {e}")
+    except Exception:
+        logger.exception("❌ Unexpected error editing client")
         ack(response_action="errors", errors={"new_name_block": "Unexpected error occurred"})
 
 # --- RE-ADDING YOUR ORIGINAL MODAL FUNCTIONS FOR COMPLETENESS ---
 def launch_update_modal(client, trigger_id):
-    projects = load_db()
-    options = [{"text": {"type": "plain_text", "text": p["client"][:75]}, "value": p["client"]} for p in projects]
+    projects = load_db(readonly=True)
+    options = _client_options(projects)
     if not options:
         return
     
@@ -2552,68 +3985,55 @@ def launch_update_modal(client, trigger_id):
     )
 
 # --- HELPER FUNCTIONS FOR MODAL ---
+_DATE_RE = re.compile(r"[0-9]{4}-[0-9]{2}-[0-9]{2}")
+
 def is_valid_date(date_str):
     """Check if date string is in YYYY-MM-DD format"""
-    if not date_str or date_str == "-":
+    # Cheap shape check first so "-", "" and free text never reach strptime
+    if not isinstance(date_str, str) or not _DATE_RE.fullmatch(date_str):
         return False
     try:
         datetime.strptime(date_str, "%Y-%m-%d")
         return True
-    except:
+    except ValueError:
         return False
 
+def _plain_options(*values):
+    """Static select options whose label is the value, plus a value -> option map"""
+    options = [{"text": {"type": "plain_text", "text": v}, "value": v} for v in values]
+    return options, {opt["value"]: opt for opt in options}
+
+# Dropdown options for the update modal, built once (shared; never mutate)
+_CATEGORY_OPTS, _CATEGORY_OPTS_BY_VALUE = _plain_options(
+    "Launched", "Ready / Scheduled", "Almost Ready", "New / In Progress", "Stuck / On Hold")
+_OWNER_OPTS, _OWNER_OPTS_BY_VALUE = _plain_options("Leo", "Jusa", "Bule", "Alen")
+_DEV_OPTS, _DEV_OPTS_BY_VALUE = _plain_options("Unassigned", "Evan", "Thanasis", "Labros", "Edis")
+_COMM_OPTS = _plain_options("Slack", "Email", "Google Meet", "Call")[0]
+
 @app.view("project_select_step")
 def handle_step_1(ack, view, client):
     try:
         selected = view["state"]["values"]["client_select"]["action"]["selected_option"]["value"]
-        projects = load_db()
-        project = next((p for p in projects if p["client"] == selected), {})
+        projects = load_db(readonly=True)
+        project = find_project(projects, selected)
         
         if not project:
             ack(response_action="errors", errors={"client_select": "Project not found"})
             return
         
         # Helper function to create select elements
-        def create_select_element(action_id, options_list, current_val, placeholder_text):
+        def create_select_element(action_id, options_list, by_value, current_val, placeholder_text):
             element = {
                 "type": "static_select",
                 "action_id": action_id,
                 "options": options_list,
                 "placeholder": {"type": "plain_text", "text": placeholder_text}
             }
-            found_opt = next((opt for opt in options_list if opt["value"] == current_val), None)
+            found_opt = by_value.get(current_val)
             if found_opt:
                 element["initial_option"] = found_opt
             return element
         
-        # Options for dropdowns
-        category_opts = [
-            {"text": {"type": "plain_text", "text": "Launched"}, "value": "Launched"},
-            {"text": {"type": "plain_text", "text": "Ready / Scheduled"}, "value": "Ready / Scheduled"},
-            {"text": {"type": "plain_text", "text": "Almost Ready"}, "value": "Almost Ready"},
-            {"text": {"type": "plain_text", "text": "New / In Progress"}, "value": "New / In Progress"},
-            {"text": {"type": "plain_text", "text": "Stuck / On Hold"}, "value": "Stuck / On Hold"}
-        ]
-        owner_opts = [
-            {"text": {"type": "plain_text", "text": "Leo"}, "value": "Leo"},
-            {"text": {"type": "plain_text", "text": "Jusa"}, "value": "Jusa"},
-            {"text": {"type": "plain_text", "text": "Bule"}, "value": "Bule"},
-            {"text": {"type": "plain_text", "text": "Alen"}, "value": "Alen"}
-        ]
-        dev_opts = [
-            {"text": {"type": "plain_text", "text": "Unassigned"}, "value": "Unassigned"},
-            {"text": {"type": "plain_text", "text": "Evan"}, "value": "Evan"},
-            {"text": {"type": "plain_text", "text": "Thanasis"}, "value": "Thanasis"},
-            {"text": {"type": "plain_text", "text": "Labros"}, "value": "Labros"},
-            {"text": {"type": "plain_text", "text": "Edis"}, "value": "Edis"}
-        ]
-        comm_opts = [
-            {"text": {"type": "plain_text", "text": "Slack"}, "value": "Slack"},
-            {"text": {"type": "plain_text", "text": "Email"}, "value": "Email"},
-            {"text": {"type": "plain_text", "text": "Google Meet"}, "value": "Google Meet"},
-            {"text": {"type": "plain_text", "text": "Call"}, "value": "Call"}
-        ]
-        
         # Get current values
         current_status = str(project.get("status", "") or "")
         current_blocker = str(project.get("blocker", "") or "").replace("-", "")
@@ -2629,11 +4049,11 @@ def handle_step_1(ack, view, client):
         curr_chans = project.get("comm_channel", "")
         init_chans = []
         if curr_chans and curr_chans != "-":
-            for opt in comm_opts:
+            for opt in _COMM_OPTS:
                 if opt["value"] in curr_chans:
                     init_chans.append(opt)
         
-        checkbox_el = {"type": "checkboxes", "action_id": "checkboxes", "options": comm_opts}
+        checkbox_el = {"type": "checkboxes", "action_id": "checkboxes", "options": _COMM_OPTS}
         if init_chans:
             checkbox_el["initial_options"] = init_chans
         
@@ -2654,42 +4074,45 @@ def handle_step_1(ack, view, client):
                 {"type": "section", "text": {"type": "mrkdwn", "text": f"📝 Editing: *{selected}*"}},
                 {"type": "input", "block_id": "client_name_hidden", "element": {"type": "plain_text_input", "action_id": "input", "initial_value": selected}, "label": {"type": "plain_text", "text": "Client"}, "optional": True},
                 {"type": "input", "block_id": "status", "label": {"type": "plain_text", "text": "Status Update"}, "element": {"type": "plain_text_input", "multiline": True, "action_id": "input", "initial_value": current_status}},
-                {"type": "input", "block_id": "category", "label": {"type": "plain_text", "text": "Category"}, "element": create_select_element("selection", category_opts, project.get("category", ""), "Select category...")},
-                {"type": "input", "block_id": "owner", "label": {"type": "plain_text", "text": "PM (Owner)"}, "element": create_select_element("selection", owner_opts, project.get("owner", ""), "Select PM...")},
-                {"type": "input", "block_id": "developer", "label": {"type": "plain_text", "text": "Developer"}, "element": create_select_element("selection", dev_opts, project.get("developer", ""), "Select Developer...")},
+                {"type": "input", "block_id": "category", "label": {"type": "plain_text", "text": "Category"}, "element": create_select_element("selection", _CATEGORY_OPTS, _CATEGORY_OPTS_BY_VALUE, project.get("category", ""), "Select category...")},
+                {"type": "input", "block_id": "owner", "label": {"type": "plain_text", "text": "PM (Owner)"}, "element": create_select_element("selection", _OWNER_OPTS, _OWNER_OPTS_BY_VALUE, project.get("owner", ""), "Select PM...")},
+                {"type": "input", "block_id": "developer", "label": {"type": "plain_text", "text": "Developer"}, "element": create_select_element("selection", _DEV_OPTS, _DEV_OPTS_BY_VALUE, project.get("developer", ""), "Select Developer...")},
                 {"type": "input", "block_id": "blocker", "optional": True, "label": {"type": "plain_text", "text": "Blocker"}, "element": {"type": "plain_text_input", "action_id": "input", "initial_value": current_blocker}},
                 {"type": "input", "block_id": "last_contact_date", "label": {"type": "plain_text", "text": "Last Contact Date"}, "element": contact_datepicker},
                 {"type": "input", "block_id": "comm_channel", "label": {"type": "plain_text", "text": "Channel"}, "element": checkbox_el},
                 {"type": "input", "block_id": "call", "optional": True, "label": {"type": "plain_text", "text": "Next Call"}, "element": call_datepicker}
             ]
         })
-    except (KeyError, TypeError) as e:
-        print(f"❌ Error processing project selection: {e}")
+    except (KeyError, TypeError):
+        logger.exception("❌ Error processing project selection")
         ack(response_action="errors", errors={"client_select": "Error loading project data"})
 
 def get_select_value(values, block_name):
     """Helper to get selected value from dropdown"""
-    try:
-        opt = values.get(block_name, {}).get("selection", {}).get("selected_option")
-        return opt["value"] if opt else None
-    except:
-        return None
+    return _dig(values, block_name, "selection", "selected_option", "value")
 
 def get_checkbox_values(values, block_name):
     """Helper to get selected checkbox values"""
-    try:
-        selected = values.get(block_name, {}).get("checkboxes", {}).get("selected_options", [])
-        return ", ".join([opt["value"] for opt in selected]) if selected else "-"
-    except:
-        return "-"
+    selected = _dig(values, block_name, "checkboxes", "selected_options")
+    return ", ".join([opt["value"] for opt in selected]) if selected else "-"
+
+PROJECT_HISTORY_LIMIT = 50  # Change-history entries kept per project
+_TRACKED_FIELDS = ("status", "category", "owner", "developer", "blocker",
+                   "last_contact_date", "call", "comm_channel")
 
-def track_project_changes(project, new_data, user_email):
+# Form fields where "-" is the empty placeholder rather than a value to save (a blocker of
+# "-" is a real "no blocker")
+_DASH_MEANS_UNSET = frozenset({"last_contact_date", "call", "comm_channel"})
+
+def track_project_changes(project, new_data, user_email, now=None):
     """Track changes to a project and store history
     
     Args:
         project: The project dictionary (will be modified)
         new_data: Dictionary of new field values
         user_email: Email of user making the change
+        now: Time of the change (default: now), so callers can stamp other fields with
+             the same instant
     
     Returns:
         dict: Summary of changes made
@@ -2699,46 +4122,26 @@ def track_project_changes(project, new_data, user_email):
         project["history"] = []
     
     # Create snapshot of current state (before changes)
-    previous_state = {
-        "status": project.get("status", ""),
-        "category": project.get("category", ""),
-        "owner": project.get("owner", ""),
-        "developer": project.get("developer", ""),
-        "blocker": project.get("blocker", ""),
-        "last_contact_date": project.get("last_contact_date", ""),
-        "call": project.get("call", ""),
-        "comm_channel": project.get("comm_channel", "")
-    }
+    previous_state = {field: project.get(field, "") for field in _TRACKED_FIELDS}
     
     # Track what changed
     changes = {}
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    
-    # Compare each field and track changes
-    field_mapping = {
-        "status": "status",
-        "category": "category",
-        "owner": "owner",
-        "developer": "developer",
-        "blocker": "blocker",
-        "last_contact_date": "last_contact_date",
-        "call": "call",
-        "comm_channel": "comm_channel"
-    }
+    timestamp = (now or datetime.now()).strftime("%Y-%m-%d %H:%M:%S")
     
-    for new_key, old_key in field_mapping.items():
-        new_value = new_data.get(new_key, "")
-        old_value = previous_state.get(old_key, "")
+    # Compare only the fields the form filled in; ""/None are never written back
+    # ("-" is: a cleared blocker), so they can't be a change
+    submitted = ((field, new_data[field]) for field in _TRACKED_FIELDS
+                 if new_data.get(field) not in ("", None))
+    for field, new_value in submitted:
+        old_value = previous_state[field]
         
         # Normalize empty values
-        if new_value in ["", "-", None]:
-            new_value = "-"
-        if old_value in ["", "-", None]:
+        if old_value in ("", "-", None):
             old_value = "-"
         
         # Track if value actually changed
-        if str(new_value).strip() != str(old_value).strip() and new_value:
-            changes[old_key] = {
+        if str(new_value).strip() != str(old_value).strip():
+            changes[field] = {
                 "old": old_value,
                 "new": new_value
             }
@@ -2751,11 +4154,11 @@ def track_project_changes(project, new_data, user_email):
             "changes": changes,
             "previous_state": previous_state
         }
-        project["history"].append(history_entry)
+        history = project["history"]
+        history.append(history_entry)
         
-        # Keep only last 50 history entries to prevent data bloat
-        if len(project["history"]) > 50:
-            project["history"] = project["history"][-50:]
+        # Keep only the last entries to prevent data bloat (trimmed in place, no copy)
+        del history[:-PROJECT_HISTORY_LIMIT]
         
         return {
             "changed": True,
@@ -2780,21 +4183,21 @@ def handle_save_final(ack, view, body, client):
         vals = view["state"]["values"]
         
         # Get client name (hidden field)
-        client_name = vals.get("client_name_hidden", {}).get("input", {}).get("value", "")
+        client_name = _dig(vals, "client_name_hidden", "input", "value", default="")
         if not client_name:
-            print("❌ Error: No client name found in form submission")
+            logger.error("❌ Error: No client name found in form submission")
             return
         
         # Get all field values
-        status = vals.get("status", {}).get("input", {}).get("value", "")
+        status = _dig(vals, "status", "input", "value", default="")
         category = get_select_value(vals, "category")
         owner = get_select_value(vals, "owner")
         developer = get_select_value(vals, "developer")
-        blocker = vals.get("blocker", {}).get("input", {}).get("value", "") or "-"
+        blocker = _dig(vals, "blocker", "input", "value") or "-"
         
         # Get dates (handle optional fields)
-        last_contact_date = vals.get("last_contact_date", {}).get("datepicker", {}).get("selected_date", "") or "-"
-        next_call = vals.get("call", {}).get("datepicker", {}).get("selected_date", "") or "-"
+        last_contact_date = _dig(vals, "last_contact_date", "datepicker", "selected_date") or "-"
+        next_call = _dig(vals, "call", "datepicker", "selected_date") or "-"
         
         # Get communication channels
         comm_channel = get_checkbox_values(vals, "comm_channel") or "-"
@@ -2815,67 +4218,39 @@ def handle_save_final(ack, view, body, client):
         found = False
         change_summary = None
         
-        for p in projects:
-            if p["client"] == client_name:
-                # Track changes before updating
-                change_summary = track_project_changes(p, new_data, user_email)
-                
-                # Update all fields (only update if value provided, otherwise keep existing)
-                if status:
-                    p["status"] = status
-                if category:
-                    p["category"] = category
-                if owner:
-                    p["owner"] = owner
-                if developer:
-                    p["developer"] = developer
-                if blocker:
-                    p["blocker"] = blocker
-                if last_contact_date and last_contact_date != "-":
-                    p["last_contact_date"] = last_contact_date
-                if next_call and next_call != "-":
-                    p["call"] = next_call
-                if comm_channel and comm_channel != "-":
-                    p["comm_channel"] = comm_channel
-                
-                p["last_updated"] = datetime.now().strftime("%Y-%m-%d %H:%M")
-                found = True
-                break
-        
-        if found:
-            try:
-                save_db(projects)
-                # Sync to knowledge base
-                sync_data_to_knowledge_base(projects)
-                
-                # Show change summary if available
-                if change_summary and change_summary.get("changed"):
-                    changes_text = []
-                    for field, change in change_summary["changes"].items():
-                        changes_text.append(f"• *{field.replace('_', ' ').title()}:* `{change['old']}` → `{change['new']}`")
-                
-                # Try to send a response (if we can get channel context)
-                try:
-                    # This will be handled by the modal response, but we can log it
-                    print(f"✅ Project '{client_name}' updated by {user_email}")
-                    print(f"   Changes: {', '.join(change_summary['changes'].keys())}")
-                except:
-                    pass
-            except Exception as e:
-                print(f"❌ Failed to save changes: {e}")
-                # We could send a message to user here if we had the context, 
-                # but for modal submissions, raising an exception usually triggers the error view
-                raise e
+        p = find_project(projects, client_name)
+        if p:
+            # Track changes before updating
+            now = datetime.now()  # One clock read for the history entry and last_updated
+            change_summary = track_project_changes(p, new_data, user_email, now)
+            
+            # Update all fields (only update if value provided, otherwise keep existing)
+            p.update({field: value for field, value in new_data.items()
+                      if value and not (value == "-" and field in _DASH_MEANS_UNSET)})
+            
+            p["last_updated"] = now.strftime("%Y-%m-%d %H:%M")
+            found = True
+        
+        if found and not (change_summary and change_summary.get("changed")):
+            # Nothing differs from what's stored: skip the Gist write and the re-sync
+            logger.info("ℹ️ Project '%s' submitted by %s without changes; nothing saved", client_name, user_email)
+        elif found:
+            changed_fields = ", ".join(change_summary.get("changes", {})) or "none"
+            # The modal has closed by now, so the outcome goes to the log (and a DM on failure)
+            on_save_done(
+                save_db(projects), f"project '{client_name}'",
+                on_success=lambda: logger.info("✅ Project '%s' updated by %s (changes: %s)",
+                                               client_name, user_email, changed_fields),
+                on_failure=lambda: _notify_save_failed(client, user_id, f"your update to *{client_name}*")
+            )
+            # Sync to knowledge base (debounced, off the request thread)
+            schedule_knowledge_sync()
         else:
-            print(f"⚠️ Warning: Project '{client_name}' not found in database")
-    except KeyError as e:
-        print(f"❌ Error accessing view state: {e}")
-        import traceback
-        traceback.print_exc()
-    except Exception as e:
-        print(f"❌ Error in handle_save_final: {e}")
-        import traceback
-        traceback.print_exc()
+            logger.warning("⚠️ Warning: Project '%s' not found in database", client_name)
+    except KeyError:
+        logger.exception("❌ Error accessing view state")
+    except Exception:
+        logger.exception("❌ Error in handle_save_final")
 
 # ==========================================
 # FEATURE: ADMIN COMMANDS (Superadmin Only)
@@ -2883,7 +4258,6 @@ def handle_save_final(ack, view, body, client):
 
 def require_superadmin(func):
     """Decorator to require superadmin (internal) access for admin commands"""
-    import functools
     @functools.wraps(func)
     def wrapper(ack, respond, command, body, client, *args, **kwargs):
         ack()
@@ -3250,26 +4624,103 @@ def command_admin_reload_config(ack, respond, command, body, client):
 def slack_events():
     return handler.handle(request)
 
+# Health checks get the same pre-encoded response every time (nothing in it varies and no
+# after_request hooks touch it)
+_HEALTH_RESPONSE = flask_app.response_class(b"Project Bot Operational", status=200, mimetype="text/plain")
+
 @flask_app.route("/")
 def health_check():
-    return "Project Bot Operational", 200
+    return _HEALTH_RESPONSE
 
 # ==========================================
 # INITIALIZATION ON STARTUP
 # ==========================================
+# Startup coordination: one init per process, and across gunicorn workers the OpenAI setup
+# runs one at a time (later workers reuse the IDs in ASSISTANT_CACHE_FILE) and only one
+# worker runs the initial sync
+INIT_LOCK_FILE = ".init.lock"
+INITIAL_SYNC_LOCK_FILE = ".initial_sync.lock"
+_INIT_LOCK = threading.Lock()
+_INITIALIZED = False
+
+def _acquire_file_lock(path, blocking=True):
+    """Take an exclusive flock on path
+    
+    Returns:
+        The open lock file (close it to release), None if another process holds it
+        (non-blocking), or False when file locking isn't available
+    """
+    if not FCNTL_AVAILABLE:
+        return False
+    try:
+        f = open(path, "a")
+    except OSError as e:
+        print(f"⚠️ Could not open {path}: {e}")
+        return False
+    try:
+        fcntl.flock(f, fcntl.LOCK_EX if blocking else fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return f
+    except OSError:
+        f.close()
+        return None
+
+def _initial_sync(lock_file=None):
+    """Startup knowledge base sync (runs on a background thread)"""
+    try:
+        logger.info("🔄 Initial sync: %s", sync_all_data_to_openai())
+    except Exception:
+        logger.exception("❌ Initial sync failed")
+    finally:
+        if lock_file:
+            lock_file.close()
+
+def _warm_project_cache():
+    """Fetch and parse the projects DB once at startup (runs on a background thread)
+    
+    Fills the Gist response cache, the shared readonly parse and the client index, so the
+    first command after a deploy doesn't pay for the GitHub round trip and full parse.
+    """
+    try:
+        projects = load_db(readonly=True)
+        projects_by_client(projects)
+        print(f"✅ Warmed project cache ({len(projects)} projects)")
+    except Exception as e:
+        print(f"⚠️ Could not warm project cache: {e}")
+
 def initialize_app():
-    """Initialize app on startup"""
-    print("🚀 Initializing Shopline Project Bot...")
+    """Initialize app on startup (no-op after the first call in a process)"""
+    global _INITIALIZED
+    with _INIT_LOCK:
+        if _INITIALIZED:
+            return
+        _INITIALIZED = True
+    
+    print(f"🚀 Initializing Shopline Project Bot... (pid {os.getpid()})")
     import openai
     print(f"📦 OpenAI SDK Version: {openai.__version__}")
     
+    if GITHUB_TOKEN and GIST_ID:
+        threading.Thread(target=_warm_project_cache, daemon=True, name="warm-cache").start()
+    
     # Setup OpenAI Assistant (if configured)
     if ai_client:
-        assistant_id, vector_store_id = setup_openai_assistant()
+        init_lock = _acquire_file_lock(INIT_LOCK_FILE)
+        try:
+            assistant_id, vector_store_id = setup_openai_assistant()
+        finally:
+            if init_lock:
+                init_lock.close()
         if assistant_id:
             print(f"✅ OpenAI Assistant ready: {assistant_id}")
-            # Initial sync
-            sync_all_data_to_openai()
+            # Initial sync runs in the background so the web server can bind right away
+            if os.environ.get("SKIP_INITIAL_SYNC") == "1":
+                print("ℹ️  SKIP_INITIAL_SYNC=1 - skipping initial knowledge base sync")
+            else:
+                sync_lock = _acquire_file_lock(INITIAL_SYNC_LOCK_FILE, blocking=False)
+                if sync_lock is None:
+                    print("ℹ️  Another worker is running the initial sync - skipping")
+                else:
+                    threading.Thread(target=_initial_sync, args=(sync_lock,), daemon=True, name="initial-sync").start()
         else:
             print("⚠️ OpenAI Assistant setup failed or not configured")
     else: